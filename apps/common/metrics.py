@@ -0,0 +1,171 @@
+"""
+Per-request latency breakdown (pool wait, query, hydration, serialization).
+
+Phases are accumulated per request in a context variable, reported in the
+Server-Timing header and aggregated into Prometheus text for /metrics.
+Gunicorn workers don't share memory, so each worker periodically dumps its
+totals to METRICS_DIR and /metrics merges every worker's file.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PHASES = ("pool_wait", "query", "hydration", "serialization", "total")
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS_DIR = os.getenv("METRICS_DIR", "/tmp/benchmark-metrics")
+FLUSH_INTERVAL = 1.0  # seconds between dumps of this worker's totals
+
+_timings = contextvars.ContextVar("timings", default=None)
+_lock = threading.Lock()
+_totals = {
+    "phases": {
+        p: {"sum": 0.0, "count": 0, "buckets": [0] * len(BUCKETS)} for p in PHASES
+    },
+    "connections_opened": 0,
+    "errors": {},
+}
+_last_flush = 0.0
+
+
+def start_request():
+    """Starts collecting phase timings for the current request."""
+    timings = {"_start": time.perf_counter()}
+    _timings.set(timings)
+    return timings
+
+
+def add(name, seconds):
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def phase(name, exclude=()):
+    """
+    Times a block as `name`. Time recorded for the `exclude` phases while
+    the block runs (e.g. query time inside ORM loading) is subtracted.
+    """
+    timings = _timings.get() or {}
+    excluded = sum(timings.get(p, 0.0) for p in exclude)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        excluded = sum(timings.get(p, 0.0) for p in exclude) - excluded
+        add(name, elapsed - excluded)
+
+
+def connection_opened():
+    """Counts a new physical DB connection (pool connect / connection_created)."""
+    with _lock:
+        _totals["connections_opened"] += 1
+
+
+def request_failed(exc):
+    """Counts an unhandled request error; PgBouncer pool timeouts get their own reason."""
+    reason = type(exc).__name__
+    if "query_wait_timeout" in str(exc):
+        reason = "query_wait_timeout"
+    with _lock:
+        _totals["errors"][reason] = _totals["errors"].get(reason, 0) + 1
+
+
+def server_timing(timings):
+    """Formats a request's phases as a Server-Timing header value (ms)."""
+    total = time.perf_counter() - timings["_start"]
+    parts = [f"{p};dur={timings[p] * 1000:.2f}" for p in PHASES[:-1] if p in timings]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def finish_request(timings):
+    """Adds a finished request's phases to this worker's totals."""
+    global _last_flush
+    timings["total"] = time.perf_counter() - timings["_start"]
+
+    with _lock:
+        for p in PHASES:
+            if p not in timings:
+                continue
+            stats = _totals["phases"][p]
+            stats["sum"] += timings[p]
+            stats["count"] += 1
+            for i, bound in enumerate(BUCKETS):
+                if timings[p] <= bound:
+                    stats["buckets"][i] += 1
+
+        now = time.monotonic()
+        if now - _last_flush >= FLUSH_INTERVAL:
+            _flush()
+            _last_flush = now
+
+
+def _flush():
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(_totals, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def render():
+    """Prometheus text exposition of every worker's totals."""
+    with _lock:
+        _flush()
+
+    merged = {
+        "phases": {
+            p: {"sum": 0.0, "count": 0, "buckets": [0] * len(BUCKETS)} for p in PHASES
+        },
+        "connections_opened": 0,
+        "errors": {},
+    }
+    for name in os.listdir(METRICS_DIR):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, name)) as f:
+                worker = json.load(f)
+        except (OSError, ValueError):
+            continue
+        merged["connections_opened"] += worker["connections_opened"]
+        for reason, count in worker["errors"].items():
+            merged["errors"][reason] = merged["errors"].get(reason, 0) + count
+        for p, stats in worker["phases"].items():
+            merged["phases"][p]["sum"] += stats["sum"]
+            merged["phases"][p]["count"] += stats["count"]
+            for i, value in enumerate(stats["buckets"]):
+                merged["phases"][p]["buckets"][i] += value
+
+    lines = [
+        "# HELP app_request_phase_seconds Time spent per request phase.",
+        "# TYPE app_request_phase_seconds histogram",
+    ]
+    for p, stats in merged["phases"].items():
+        for bound, value in zip(BUCKETS, stats["buckets"]):
+            lines.append(
+                f'app_request_phase_seconds_bucket{{phase="{p}",le="{bound}"}} {value}'
+            )
+        lines.append(
+            f'app_request_phase_seconds_bucket{{phase="{p}",le="+Inf"}} {stats["count"]}'
+        )
+        lines.append(f'app_request_phase_seconds_sum{{phase="{p}"}} {stats["sum"]}')
+        lines.append(f'app_request_phase_seconds_count{{phase="{p}"}} {stats["count"]}')
+
+    lines.extend(
+        [
+            "# HELP app_db_connections_opened_total Physical DB connections opened.",
+            "# TYPE app_db_connections_opened_total counter",
+            f'app_db_connections_opened_total {merged["connections_opened"]}',
+            "# HELP app_request_errors_total Unhandled request errors by reason.",
+            "# TYPE app_request_errors_total counter",
+        ]
+    )
+    for reason, count in sorted(merged["errors"].items()):
+        lines.append(f'app_request_errors_total{{reason="{reason}"}} {count}')
+    return "\n".join(lines) + "\n"
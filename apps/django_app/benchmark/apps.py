@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 class BenchmarkConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'benchmark'
+
+    def ready(self):
+        from . import metrics
+
+        def count_connection(sender, connection, **kwargs):
+            metrics.connection_opened()
+
+        connection_created.connect(count_connection, weak=False)
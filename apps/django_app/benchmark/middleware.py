@@ -0,0 +1,37 @@
+from contextlib import ExitStack
+
+from django.db import connections
+
+from . import metrics
+
+
+def time_query(execute, sql, params, many, context):
+    with metrics.phase("query"):
+        return execute(sql, params, many, context)
+
+
+class TimingMiddleware:
+    """
+    Collects per-request phase timings and adds the Server-Timing header.
+    Statement execution is timed with an execute_wrapper on every database alias.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == "/metrics":
+            return self.get_response(request)
+
+        timings = metrics.start_request()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(time_query))
+            response = self.get_response(request)
+
+        response["Server-Timing"] = metrics.server_timing(timings)
+        metrics.finish_request(timings)
+        return response
+
+    def process_exception(self, request, exception):
+        metrics.request_failed(exception)
@@ -3,4 +3,6 @@ from . import views
 
 urlpatterns = [
     path('db-test', views.db_test),
+    path('posts', views.batch_posts),
+    path('comments/stream', views.stream_comments),
 ]
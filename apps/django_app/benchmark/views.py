@@ -1,30 +1,203 @@
+import json
 import random
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db import InterfaceError, OperationalError, connections, router
 from django.db.models import Prefetch
+from . import metrics
+from .metrics import phase
 from .models import Post, Comment
 
 NUM_POSTS = 50_000
+MAX_BATCH_SIZE = 500
+BATCH_STRATEGIES = ("serial", "any", "pipeline")
+STREAM_MAX_ROWS = 100_000  # NUM_COMMENTS in seed.py
 
-def db_test(request):
-    post_id = random.randint(1, NUM_POSTS)
-    
-    # Django ORM efficient fetching:
-    # 1. Post + User (JOIN)
-    # 2. Comments + User (JOIN in 2nd query)
-    try:
-        post = Post.objects.select_related('user').prefetch_related(
-            Prefetch('comments', queryset=Comment.objects.select_related('user'))
-        ).get(id=post_id)
-    except Post.DoesNotExist:
-         return JsonResponse({"error": "Post not found"}, status=404)
-         
-    return JsonResponse({
+# One post with author and comments per execution, for the pipeline strategy
+# (raw psycopg, so rows are grouped by hand instead of by the ORM)
+POST_ROWS_SQL = """
+    SELECT p.id, p.title, p.created_at, u.username, cu.username, c.content
+    FROM posts p
+    JOIN users u ON u.id = p.user_id
+    LEFT JOIN comments c ON c.post_id = p.id
+    LEFT JOIN users cu ON cu.id = c.user_id
+    WHERE p.id = %s
+"""
+
+
+def run_with_retry(alias, operation):
+    """
+    Runs `operation()`, retrying up to DB_RETRY_ATTEMPTS times when the
+    connection was lost (pgbouncer/postgres restart). Other errors, such as
+    PgBouncer's query_wait_timeout, are raised as in the SQLAlchemy apps
+    (which retry only when psycopg reports the connection closed/broken).
+    The lost connection is closed so the retry opens a new one.
+    """
+    for attempt in range(settings.DB_RETRY_ATTEMPTS + 1):
+        try:
+            return operation()
+        except (OperationalError, InterfaceError):
+            raw = connections[alias].connection
+            dropped = raw is not None and (raw.closed or raw.broken)
+            if attempt == settings.DB_RETRY_ATTEMPTS or not dropped:
+                raise
+            connections[alias].close()
+
+
+def posts_with_comments():
+    """Post + User (JOIN), then Comments + User (JOIN in 2nd query)."""
+    return Post.objects.select_related('user').prefetch_related(
+        Prefetch('comments', queryset=Comment.objects.select_related('user'))
+    )
+
+
+def post_to_dict(post):
+    return {
         "post_id": post.id,
         "title": post.title,
         "author": post.user.username,
         "last_updated": post.created_at.isoformat(),
         "comments": [
-            {"user": c.user.username, "content": c.content} 
+            {"user": c.user.username, "content": c.content}
             for c in post.comments.all()
         ]
-    })
+    }
+
+
+def rows_to_dict(rows):
+    """Same shape as post_to_dict from POST_ROWS_SQL rows of one post."""
+    post_id, title, created_at, author = rows[0][:4]
+    return {
+        "post_id": post_id,
+        "title": title,
+        "author": author,
+        "last_updated": created_at.isoformat(),
+        "comments": [
+            {"user": user, "content": content}
+            for *_, user, content in rows
+            if content is not None
+        ]
+    }
+
+
+def db_test(request):
+    post_id = random.randint(1, NUM_POSTS)
+    
+    alias = router.db_for_read(Post)
+
+    def load_post():
+        # Django has no pool: this is connection setup unless CONN_MAX_AGE reuses
+        # one. In autocommit every statement is its own PgBouncer transaction,
+        # so bouncer queueing shows up as query time, per statement.
+        with phase("pool_wait"):
+            connections[alias].ensure_connection()
+
+        # Django ORM efficient fetching:
+        # 1. Post + User (JOIN)
+        # 2. Comments + User (JOIN in 2nd query)
+        with phase("hydration", exclude=("query",)):
+            return posts_with_comments().get(id=post_id)
+
+    try:
+        post = run_with_retry(alias, load_post)
+    except Post.DoesNotExist:
+         return JsonResponse({"error": "Post not found"}, status=404)
+         
+    with phase("serialization"):
+        return JsonResponse(post_to_dict(post))
+
+
+def batch_posts(request):
+    """
+    Fetches every post in ?ids=1,2,3 with author and comments.
+    ?strategy=
+      serial:   one ORM lookup per post (a round trip each, plus the prefetch)
+      any:      set-based: two queries for the whole batch (id__in; Django
+                has no ANY lookup, the planner treats both the same)
+      pipeline: one query per post sent in psycopg pipeline mode; every
+                result comes back after a single sync (one round trip)
+    """
+    try:
+        post_ids = [int(i) for i in request.GET.get("ids", "").split(",")]
+    except ValueError:
+        return JsonResponse({"error": "ids must be integers"}, status=400)
+    strategy = request.GET.get("strategy", "any")
+    if len(post_ids) > MAX_BATCH_SIZE or strategy not in BATCH_STRATEGIES:
+        return JsonResponse({"error": "Invalid batch"}, status=400)
+
+    alias = router.db_for_read(Post)
+
+    def load_posts():
+        with phase("pool_wait"):
+            connections[alias].ensure_connection()
+
+        if strategy == "pipeline":
+            # Raw psycopg connection: the execute_wrapper doesn't see these
+            # statements, so the query phase is timed here
+            connection = connections[alias].connection
+            with phase("query"):
+                with connection.pipeline():
+                    cursors = [
+                        connection.execute(POST_ROWS_SQL, (post_id,))
+                        for post_id in post_ids
+                    ]
+                    results = [cursor.fetchall() for cursor in cursors]
+            with phase("hydration"):
+                return [rows_to_dict(rows) for rows in results if rows]
+
+        with phase("hydration", exclude=("query",)):
+            if strategy == "any":
+                return list(posts_with_comments().filter(id__in=post_ids))
+            return [
+                posts_with_comments().filter(id=post_id).first()
+                for post_id in post_ids
+            ]
+
+    posts = run_with_retry(alias, load_posts)
+
+    with phase("serialization"):
+        if strategy != "pipeline":
+            posts = [post_to_dict(post) for post in posts if post]
+        return JsonResponse({"posts": posts})
+
+
+def stream_comments(request):
+    """
+    Streams ?rows= comments as NDJSON with StreamingHttpResponse.
+    .iterator(chunk_size=...) reads them through a named server-side cursor,
+    except under transaction pooling: there DISABLE_SERVER_SIDE_CURSORS is on
+    (Django's WITH HOLD cursor would outlive the transaction PgBouncer ties
+    it to) and psycopg loads the whole result into the worker instead.
+    """
+    try:
+        rows = int(request.GET.get("rows", 10_000))
+        chunk_size = int(request.GET.get("chunk_size", 1000))
+    except ValueError:
+        return JsonResponse({"error": "rows/chunk_size must be integers"}, status=400)
+    if not 0 < rows <= STREAM_MAX_ROWS or chunk_size < 1:
+        return JsonResponse({"error": "Invalid rows/chunk_size"}, status=400)
+
+    queryset = Comment.objects.order_by("id").values_list(
+        "id", "post_id", "user__username", "content"
+    )[:rows]
+
+    def generate():
+        lines = []
+        for comment_id, post_id, username, content in queryset.iterator(chunk_size=chunk_size):
+            lines.append(json.dumps({
+                "comment_id": comment_id,
+                "post_id": post_id,
+                "user": username,
+                "content": content,
+            }) + "\n")
+            if len(lines) >= chunk_size:
+                yield "".join(lines)
+                lines = []
+        if lines:
+            yield "".join(lines)
+
+    return StreamingHttpResponse(generate(), content_type="application/x-ndjson")
+
+
+def prometheus_metrics(request):
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4")
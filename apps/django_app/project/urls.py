@@ -1,5 +1,8 @@
 from django.urls import path, include
 
+from benchmark.views import prometheus_metrics
+
 urlpatterns = [
     path('benchmark/', include('benchmark.urls')),
+    path('metrics', prometheus_metrics),
 ]
@@ -1,17 +1,83 @@
+import asyncio
+import json
 import random
 from fastapi import FastAPI, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Integer, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import joinedload
 
 
-from database import get_db
-from models import Post, Comment
+import metrics
+from database import AsyncSessionLocal, get_db, run_with_retry
+from metrics import phase
+from models import Post, Comment, User
+
+
+class TimingMiddleware:
+    """
+    Collects per-request phase timings and adds the Server-Timing header.
+    Plain ASGI rather than BaseHTTPMiddleware to keep its own overhead out of the numbers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        timings = metrics.start_request()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append(
+                    (b"server-timing", metrics.server_timing(timings).encode())
+                )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        except Exception as exc:
+            metrics.request_failed(exc)
+            raise
+        finally:
+            metrics.finish_request(timings)
+
 
 app = FastAPI()
+app.add_middleware(TimingMiddleware)
 
 # Configured in seed.py
 NUM_POSTS = 50_000
+MAX_BATCH_SIZE = 500
+BATCH_STRATEGIES = ("serial", "any", "gather")
+STREAM_MAX_ROWS = 100_000  # NUM_COMMENTS in seed.py
+
+
+def posts_with_comments():
+    """Posts with their author and comments (and comment authors) as SQL JOINs."""
+    return select(Post).options(
+        joinedload(Post.author),
+        joinedload(Post.comments).joinedload(Comment.author),
+    )
+
+
+def post_to_dict(post):
+    return {
+        "post_id": post.id,
+        "title": post.title,
+        "author": post.author.username,
+        "last_updated": post.created_at,
+        "comments": [
+            {"user": c.author.username, "content": c.content} for c in post.comments
+        ],
+    }
 
 
 @app.get("/benchmark/db-test")
@@ -25,29 +91,131 @@ async def db_test(db: AsyncSession = Depends(get_db)):
     post_id = random.randint(1, NUM_POSTS)
 
     # Using joinedload to force SQL JOINs
-    stmt = (
-        select(Post)
-        .options(
-            joinedload(Post.author),
-            joinedload(Post.comments).joinedload(Comment.author),
-        )
-        .where(Post.id == post_id)
-    )
+    stmt = posts_with_comments().where(Post.id == post_id)
+
+    async def load_post():
+        # Check out the connection up front so app-side pool wait is timed on its
+        # own. PgBouncer only assigns a server connection when the first
+        # statement arrives, so its queueing shows up as query time.
+        with phase("pool_wait"):
+            await db.connection(bind_arguments={"clause": stmt})
 
-    result = await db.execute(stmt)
-    # unique() is required when using joinedload with 1:N relationships in asyncio/modern SQLAlchemy
-    post = result.unique().scalars().first()
+        with phase("hydration", exclude=("query",)):
+            result = await db.execute(stmt)
+            # unique() is required when using joinedload with 1:N relationships in asyncio/modern SQLAlchemy
+            return result.unique().scalars().first()
+
+    post = await run_with_retry(db, load_post)
 
     if not post:
         # In case of gaps or sync issues, though seed is sequential types
         raise HTTPException(status_code=404, detail="Post not found")
 
-    return {
-        "post_id": post.id,
-        "title": post.title,
-        "author": post.author.username,
-        "last_updated": post.created_at,
-        "comments": [
-            {"user": c.author.username, "content": c.content} for c in post.comments
-        ],  # Accessing comments triggers lazy load if not eager loaded, but we eager loaded
-    }
+    # Same encoding FastAPI applies to a returned dict, done here so it can be timed
+    with phase("serialization"):
+        return JSONResponse(jsonable_encoder(post_to_dict(post)))
+
+
+@app.get("/benchmark/posts")
+async def batch_posts(
+    ids: str, strategy: str = "any", db: AsyncSession = Depends(get_db)
+):
+    """
+    Fetches every post in `ids` (comma separated) with author and comments.
+    strategy:
+    - serial: one query per post on this request's connection (a round trip each)
+    - any: one set-based query, WHERE posts.id = ANY(:ids)
+    - gather: one query per post, each on its own pooled connection, run
+      concurrently with asyncio.gather (asyncpg can't overlap queries on one
+      connection, so concurrency costs connections)
+    """
+    try:
+        post_ids = [int(i) for i in ids.split(",")]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be integers")
+    if len(post_ids) > MAX_BATCH_SIZE or strategy not in BATCH_STRATEGIES:
+        raise HTTPException(status_code=400, detail="Invalid batch")
+
+    if strategy == "gather":
+        # Phases would overlap across connections, so only serialization is timed
+        async def load_one(post_id):
+            async with AsyncSessionLocal() as session:
+                stmt = posts_with_comments().where(Post.id == post_id)
+                result = await session.execute(stmt)
+                return result.unique().scalars().first()
+
+        posts = await asyncio.gather(*(load_one(i) for i in post_ids))
+    else:
+        stmt = posts_with_comments()
+
+        async def load_posts():
+            with phase("pool_wait"):
+                await db.connection(bind_arguments={"clause": stmt})
+
+            with phase("hydration", exclude=("query",)):
+                if strategy == "any":
+                    result = await db.execute(
+                        stmt.where(
+                            Post.id == any_(bindparam("ids", post_ids, ARRAY(Integer)))
+                        )
+                    )
+                    return result.unique().scalars().all()
+
+                posts = []
+                for post_id in post_ids:
+                    result = await db.execute(stmt.where(Post.id == post_id))
+                    posts.append(result.unique().scalars().first())
+                return posts
+
+        posts = await run_with_retry(db, load_posts)
+
+    with phase("serialization"):
+        return JSONResponse(
+            jsonable_encoder({"posts": [post_to_dict(p) for p in posts if p]})
+        )
+
+
+@app.get("/benchmark/comments/stream")
+async def stream_comments(rows: int = 10_000, chunk_size: int = 1000):
+    """
+    Streams `rows` comments as NDJSON. session.stream() reads them through an
+    asyncpg server-side cursor, `chunk_size` rows at a time, so worker memory
+    stays flat. Under transaction pooling the cursor's transaction holds one
+    PgBouncer server connection until the last row is sent.
+    """
+    if not 0 < rows <= STREAM_MAX_ROWS or chunk_size < 1:
+        raise HTTPException(status_code=400, detail="Invalid rows/chunk_size")
+
+    stmt = (
+        select(Comment.id, Comment.post_id, User.username, Comment.content)
+        .join(Comment.author)
+        .order_by(Comment.id)
+        .limit(rows)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    # The session lives in the generator: dependency cleanup (get_db) runs
+    # before a streaming body is sent
+    async def generate():
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(stmt)
+            async for partition in result.partitions():
+                yield "".join(
+                    json.dumps(
+                        {
+                            "comment_id": comment_id,
+                            "post_id": post_id,
+                            "user": username,
+                            "content": content,
+                        }
+                    )
+                    + "\n"
+                    for comment_id, post_id, username, content in partition
+                )
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
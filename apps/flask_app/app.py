@@ -1,19 +1,93 @@
+import json
 import random
-from flask import Flask, jsonify
-from sqlalchemy import select
+from flask import Flask, Response, g, jsonify, request, stream_with_context
+from sqlalchemy import Integer, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import joinedload
 
-from database import SessionLocal
-from models import Post, Comment
+import metrics
+from database import SessionLocal, run_with_retry
+from metrics import phase
+from models import Post, Comment, User
 
 app = Flask(__name__)
 
 NUM_POSTS = 50_000
+MAX_BATCH_SIZE = 500
+BATCH_STRATEGIES = ("serial", "any", "pipeline")
+STREAM_MAX_ROWS = 100_000  # NUM_COMMENTS in seed.py
+
+# One post with author and comments per execution, for the pipeline strategy
+# (raw psycopg, so rows are grouped by hand instead of by the ORM)
+POST_ROWS_SQL = """
+    SELECT p.id, p.title, p.created_at, u.username, cu.username, c.content
+    FROM posts p
+    JOIN users u ON u.id = p.user_id
+    LEFT JOIN comments c ON c.post_id = p.id
+    LEFT JOIN users cu ON cu.id = c.user_id
+    WHERE p.id = %s
+"""
+
+def posts_with_comments():
+    """Posts with their author and comments (and comment authors) as SQL JOINs."""
+    return select(Post).options(
+        joinedload(Post.author),
+        joinedload(Post.comments).joinedload(Comment.author)
+    )
+
+def post_to_dict(post):
+    return {
+        "post_id": post.id,
+        "title": post.title,
+        "author": post.author.username,
+        "last_updated": post.created_at.isoformat(),
+        "comments": [
+            {"user": c.author.username, "content": c.content}
+            for c in post.comments
+        ]
+    }
+
+def rows_to_dict(rows):
+    """Same shape as post_to_dict from POST_ROWS_SQL rows of one post."""
+    post_id, title, created_at, author = rows[0][:4]
+    return {
+        "post_id": post_id,
+        "title": title,
+        "author": author,
+        "last_updated": created_at.isoformat(),
+        "comments": [
+            {"user": user, "content": content}
+            for *_, user, content in rows
+            if content is not None
+        ]
+    }
 
 @app.teardown_appcontext
 def remove_session(exception=None):
     SessionLocal.remove()
 
+@app.before_request
+def start_timing():
+    if request.path != "/metrics":
+        g.timings = metrics.start_request()
+
+@app.after_request
+def add_server_timing(response):
+    timings = g.pop("timings", None)
+    if timings is not None:
+        response.headers["Server-Timing"] = metrics.server_timing(timings)
+        metrics.finish_request(timings)
+    return response
+
+@app.teardown_request
+def count_error(exception=None):
+    if exception is not None:
+        metrics.request_failed(exception)
+
+@app.route("/metrics")
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 @app.route("/benchmark/db-test")
 def db_test():
     """
@@ -25,27 +99,115 @@ def db_test():
     post_id = random.randint(1, NUM_POSTS)
     
     # Consistent logic with FastAPI: joinedload author + comments + comment author
-    stmt = (
-        select(Post)
-        .options(
-            joinedload(Post.author),
-            joinedload(Post.comments).joinedload(Comment.author)
-        )
-        .where(Post.id == post_id)
-    )
+    stmt = posts_with_comments().where(Post.id == post_id)
     
-    post = session.execute(stmt).unique().scalars().first()
+    def load_post():
+        # Check out the connection up front so app-side pool wait is timed on its
+        # own. PgBouncer only assigns a server connection when the first
+        # statement arrives, so its queueing shows up as query time.
+        with phase("pool_wait"):
+            session.connection(bind_arguments={"clause": stmt})
+
+        with phase("hydration", exclude=("query",)):
+            return session.execute(stmt).unique().scalars().first()
+
+    post = run_with_retry(session, load_post)
     
     if not post:
         return jsonify({"error": "Post not found"}), 404
         
-    return jsonify({
-        "post_id": post.id,
-        "title": post.title,
-        "author": post.author.username,
-        "last_updated": post.created_at.isoformat(),
-        "comments": [
-            {"user": c.author.username, "content": c.content} 
-            for c in post.comments
-        ]
-    })
+    with phase("serialization"):
+        return jsonify(post_to_dict(post))
+
+@app.route("/benchmark/posts")
+def batch_posts():
+    """
+    Fetches every post in ?ids=1,2,3 with author and comments.
+    ?strategy=
+      serial:   one ORM query per post (a round trip each)
+      any:      one set-based query, WHERE posts.id = ANY(:ids)
+      pipeline: one query per post sent in psycopg pipeline mode; every
+                result comes back after a single sync (one round trip)
+    """
+    try:
+        post_ids = [int(i) for i in request.args.get("ids", "").split(",")]
+    except ValueError:
+        return jsonify({"error": "ids must be integers"}), 400
+    strategy = request.args.get("strategy", "any")
+    if len(post_ids) > MAX_BATCH_SIZE or strategy not in BATCH_STRATEGIES:
+        return jsonify({"error": "Invalid batch"}), 400
+
+    session = SessionLocal()
+    stmt = posts_with_comments()
+
+    def load_posts():
+        with phase("pool_wait"):
+            connection = session.connection(bind_arguments={"clause": stmt})
+
+        if strategy == "pipeline":
+            # Bypasses SQLAlchemy's cursor events, so the query phase is timed here
+            driver_connection = connection.connection.driver_connection
+            with phase("query"):
+                with driver_connection.pipeline():
+                    cursors = [
+                        driver_connection.execute(POST_ROWS_SQL, (post_id,))
+                        for post_id in post_ids
+                    ]
+                    results = [cursor.fetchall() for cursor in cursors]
+            with phase("hydration"):
+                return [rows_to_dict(rows) for rows in results if rows]
+
+        with phase("hydration", exclude=("query",)):
+            if strategy == "any":
+                return session.execute(
+                    stmt.where(Post.id == any_(bindparam("ids", post_ids, ARRAY(Integer))))
+                ).unique().scalars().all()
+            return [
+                session.execute(stmt.where(Post.id == post_id)).unique().scalars().first()
+                for post_id in post_ids
+            ]
+
+    posts = run_with_retry(session, load_posts)
+
+    with phase("serialization"):
+        if strategy != "pipeline":
+            posts = [post_to_dict(post) for post in posts if post]
+        return jsonify({"posts": posts})
+
+@app.route("/benchmark/comments/stream")
+def stream_comments():
+    """
+    Streams ?rows= comments as NDJSON. yield_per makes SQLAlchemy read them
+    through a psycopg named (server-side) cursor, ?chunk_size= rows at a time;
+    stream_with_context keeps the request and its session open meanwhile.
+    Under transaction pooling the cursor's transaction holds one PgBouncer
+    server connection until the last row is sent.
+    """
+    rows = request.args.get("rows", 10_000, type=int)
+    chunk_size = request.args.get("chunk_size", 1000, type=int)
+    if not 0 < rows <= STREAM_MAX_ROWS or chunk_size < 1:
+        return jsonify({"error": "Invalid rows/chunk_size"}), 400
+
+    session = SessionLocal()
+    stmt = (
+        select(Comment.id, Comment.post_id, User.username, Comment.content)
+        .join(Comment.author)
+        .order_by(Comment.id)
+        .limit(rows)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    @stream_with_context
+    def generate():
+        for partition in session.execute(stmt).partitions():
+            yield "".join(
+                json.dumps({
+                    "comment_id": comment_id,
+                    "post_id": post_id,
+                    "user": username,
+                    "content": content,
+                }) + "\n"
+                for comment_id, post_id, username, content in partition
+            )
+
+    return Response(generate(), mimetype="application/x-ndjson")
@@ -0,0 +1,325 @@
+"""
+Regression gate: compares a candidate results directory against a baseline.
+
+    python compare.py baselines/v1 results
+    python compare.py baselines/v1/pooler results/pooler --rps-threshold 5
+
+Scenarios are matched on their dimensions (framework, pool mode, users...).
+A metric regresses when it gets worse by more than its threshold *and* by
+more than the run-to-run noise seen in Locust's per-second history. Exits 1
+if any scenario regresses or is missing from the candidate.
+"""
+
+import argparse
+import math
+import os
+import statistics
+import sys
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from run_benchmark import load_scenario, summarize_scenario
+
+# Default thresholds (relative change that counts as a regression)
+RPS_THRESHOLD = 10.0  # % drop
+P99_THRESHOLD = 15.0  # % increase
+CPU_THRESHOLD = 15.0  # % increase
+CPU_FLOOR = 5.0  # CPU changes below this many points are ignored
+FAILURE_THRESHOLD = 1.0  # Failure rate increase, in percentage points
+NOISE_Z = 2.0  # Noise band = NOISE_Z standard errors of the difference
+WARMUP_FRACTION = 0.2  # Leading share of the history skipped as ramp-up
+
+PERCENTILES = [
+    "50%",
+    "66%",
+    "75%",
+    "80%",
+    "90%",
+    "95%",
+    "98%",
+    "99%",
+    "99.9%",
+    "99.99%",
+]
+
+
+def load_results(results_dir):
+    """Returns {dims key: (base_name, scenario, summary row)} for a results dir."""
+    results = {}
+    for filename in sorted(os.listdir(results_dir)):
+        if not filename.endswith("_stats.csv"):
+            continue
+        base_name = filename.replace("_stats.csv", "")
+        scenario = load_scenario(results_dir, base_name)
+        if scenario is None:
+            continue
+        try:
+            row = summarize_scenario(results_dir, base_name, scenario)
+        except Exception as e:
+            print(f"Failed to process {filename}: {e}")
+            continue
+        key = tuple(sorted(scenario["dims"].items()))
+        results[key] = (base_name, scenario, row)
+    return results
+
+
+def history_series(results_dir, base_name, column):
+    """
+    Per-second values of `column` ("Requests/s", "99%") from Locust's
+    aggregated history, without the ramp-up. None if there is no history.
+    """
+    path = os.path.join(results_dir, f"{base_name}_stats_history.csv")
+    if not os.path.exists(path):
+        return None
+    df = pd.read_csv(path)
+    values = pd.to_numeric(
+        df[df["Name"] == "Aggregated"][column], errors="coerce"
+    ).dropna()
+    values = values[values > 0].tolist()
+    return values[int(len(values) * WARMUP_FRACTION) :]
+
+
+def noise_percent(baseline, candidate, reference):
+    """
+    Noise band (% of `reference`) for the difference of two per-second
+    series' means: NOISE_Z standard errors. 0 without enough samples.
+    """
+    if not baseline or not candidate or len(baseline) < 3 or len(candidate) < 3:
+        return 0.0
+    se = math.sqrt(
+        statistics.variance(baseline) / len(baseline)
+        + statistics.variance(candidate) / len(candidate)
+    )
+    return NOISE_Z * se / reference * 100 if reference else 0.0
+
+
+def check(
+    metric,
+    base,
+    cand,
+    threshold,
+    noise=0.0,
+    higher_is_better=False,
+    floor=0.0,
+    absolute=False,
+):
+    """
+    Compares one metric. The allowed change is the larger of `threshold` and
+    `noise` (in the delta's unit); absolute changes under `floor` are never
+    flagged.
+    With `absolute`, the delta is `cand - base` in the metric's own units
+    (percentage points for a rate), reported with Unit "pts" instead of "%".
+    """
+    if absolute:
+        delta = cand - base
+    else:
+        delta = (cand - base) / base * 100 if base else 0.0
+    worse = -delta if higher_is_better else delta
+    allowed = max(threshold, noise)
+    if abs(cand - base) < floor or abs(worse) <= allowed:
+        status = "ok"
+    else:
+        status = "FAIL" if worse > 0 else "better"
+    return {
+        "Metric": metric,
+        "Baseline": round(base, 2),
+        "Candidate": round(cand, 2),
+        "Delta": round(delta, 1),
+        "Allowed": round(allowed, 1),
+        "Unit": "pts" if absolute else "%",
+        "Status": status,
+    }
+
+
+def compare_scenario(baseline_dir, candidate_dir, baseline, candidate, thresholds):
+    """All metric checks for one matched scenario."""
+    base_name, _, base_row = baseline
+    cand_name, _, cand_row = candidate
+    checks = []
+
+    rps_noise = noise_percent(
+        history_series(baseline_dir, base_name, "Requests/s"),
+        history_series(candidate_dir, cand_name, "Requests/s"),
+        base_row["RPS"],
+    )
+    checks.append(
+        check(
+            "RPS",
+            base_row["RPS"],
+            cand_row["RPS"],
+            thresholds["rps"],
+            rps_noise,
+            higher_is_better=True,
+        )
+    )
+
+    p99_noise = noise_percent(
+        history_series(baseline_dir, base_name, "99%"),
+        history_series(candidate_dir, cand_name, "99%"),
+        base_row["P99 Latency (ms)"],
+    )
+    checks.append(
+        check(
+            "P99 Latency (ms)",
+            base_row["P99 Latency (ms)"],
+            cand_row["P99 Latency (ms)"],
+            thresholds["p99"],
+            p99_noise,
+        )
+    )
+
+    # Failure rate is compared in absolute points: the baseline is usually 0
+    base_fail = base_row["Failures/s"] / base_row["RPS"] * 100 if base_row["RPS"] else 0
+    cand_fail = cand_row["Failures/s"] / cand_row["RPS"] * 100 if cand_row["RPS"] else 0
+    checks.append(
+        check(
+            "Failure Rate (%)",
+            base_fail,
+            cand_fail,
+            thresholds["failures"],
+            absolute=True,
+        )
+    )
+
+    for column in base_row:
+        if column.endswith("CPU (%)") and column in cand_row:
+            checks.append(
+                check(
+                    column,
+                    base_row[column],
+                    cand_row[column],
+                    thresholds["cpu"],
+                    floor=CPU_FLOOR,
+                )
+            )
+    return checks
+
+
+def plot_overlay(baseline_dir, candidate_dir, base_name, cand_name, title, path):
+    """Baseline vs candidate latency percentiles for one scenario."""
+    curves = {}
+    for label, results_dir, name in (
+        ("baseline", baseline_dir, base_name),
+        ("candidate", candidate_dir, cand_name),
+    ):
+        df = pd.read_csv(os.path.join(results_dir, f"{name}_stats.csv"))
+        agg = df[df["Name"] == "Aggregated"].iloc[0]
+        curves[label] = [
+            pd.to_numeric(agg[p], errors="coerce") if p in agg else None
+            for p in PERCENTILES
+        ]
+
+    plt.figure(figsize=(10, 5))
+    for label, values in curves.items():
+        plt.plot(range(len(PERCENTILES)), values, marker="o", label=label)
+    plt.xticks(range(len(PERCENTILES)), PERCENTILES)
+    plt.yscale("log")
+    plt.xlabel("Percentile")
+    plt.ylabel("Latency (ms)")
+    plt.title(title)
+    plt.legend()
+    plt.grid(True, which="both", alpha=0.3)
+    plt.savefig(path)
+    plt.close()
+
+
+def scenario_label(key):
+    return " | ".join(f"{name}={value}" for name, value in key)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare a benchmark run against a stored baseline"
+    )
+    parser.add_argument("baseline", help="baseline results directory")
+    parser.add_argument("candidate", help="candidate results directory")
+    parser.add_argument("--rps-threshold", type=float, default=RPS_THRESHOLD)
+    parser.add_argument("--p99-threshold", type=float, default=P99_THRESHOLD)
+    parser.add_argument("--cpu-threshold", type=float, default=CPU_THRESHOLD)
+    parser.add_argument(
+        "--failure-threshold",
+        type=float,
+        default=FAILURE_THRESHOLD,
+        help="allowed failure rate increase in percentage points",
+    )
+    parser.add_argument(
+        "--output",
+        help="where to write comparison_report.csv and the latency overlays "
+        "(default: <candidate>/compare)",
+    )
+    args = parser.parse_args()
+
+    thresholds = {
+        "rps": args.rps_threshold,
+        "p99": args.p99_threshold,
+        "cpu": args.cpu_threshold,
+        "failures": args.failure_threshold,
+    }
+    output = args.output or os.path.join(args.candidate, "compare")
+    overlay_dir = os.path.join(output, "overlays")
+    os.makedirs(overlay_dir, exist_ok=True)
+
+    baseline = load_results(args.baseline)
+    candidate = load_results(args.candidate)
+    if not baseline:
+        print(f"No scenarios found in {args.baseline}")
+        return 1
+
+    rows = []
+    failed = []
+    for key, base in baseline.items():
+        label = scenario_label(key)
+        if key not in candidate:
+            print(f"MISSING  {label}")
+            rows.append({**dict(key), "Metric": "-", "Status": "MISSING"})
+            failed.append(label)
+            continue
+
+        cand = candidate[key]
+        checks = compare_scenario(args.baseline, args.candidate, base, cand, thresholds)
+        verdict = "FAIL" if any(c["Status"] == "FAIL" for c in checks) else "PASS"
+        if verdict == "FAIL":
+            failed.append(label)
+
+        print(f"{verdict:<8} {label}")
+        for c in checks:
+            print(
+                f"    {c['Metric']:<20} {c['Baseline']:>10} -> {c['Candidate']:<10} "
+                f"{c['Delta']:+7.1f}{c['Unit']} (allowed {c['Allowed']}{c['Unit']}) "
+                f"{c['Status']}"
+            )
+        rows.extend({**dict(key), **c} for c in checks)
+
+        try:
+            plot_overlay(
+                args.baseline,
+                args.candidate,
+                base[0],
+                cand[0],
+                label,
+                os.path.join(overlay_dir, f"{cand[0]}.png"),
+            )
+        except Exception as e:
+            print(f"Overlay Warning: {e}")
+
+    extra = set(candidate) - set(baseline)
+    if extra:
+        print(f"{len(extra)} candidate scenario(s) have no baseline and were skipped")
+
+    report = os.path.join(output, "comparison_report.csv")
+    pd.DataFrame(rows).to_csv(report, index=False)
+    print(f"Comparison Report Saved to {report}")
+
+    if failed:
+        print(f"RESULT: FAIL ({len(failed)} of {len(baseline)} scenarios)")
+        return 1
+    print(f"RESULT: PASS ({len(baseline)} scenarios)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
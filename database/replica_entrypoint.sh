@@ -0,0 +1,18 @@
+#!/bin/bash
+# Entry point for postgres-replica: clones the primary on first start and
+# runs as a hot standby. Every replica gets its own (anonymous) data volume.
+set -e
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+    mkdir -p "$PGDATA"
+    chown postgres:postgres "$PGDATA"
+    chmod 700 "$PGDATA"
+
+    until gosu postgres pg_basebackup -h "$PRIMARY_HOST" -U postgres -D "$PGDATA" -R -X stream; do
+        echo "Waiting for primary $PRIMARY_HOST..."
+        rm -rf "${PGDATA:?}"/*
+        sleep 1
+    done
+fi
+
+exec gosu postgres postgres -c hot_standby=on
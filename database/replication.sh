@@ -0,0 +1,6 @@
+#!/bin/bash
+# Allows the streaming replicas (postgres-replica) to run pg_basebackup and
+# stream WAL from this primary. Runs once, when the data directory is created.
+set -e
+
+echo "host replication all all trust" >> "$PGDATA/pg_hba.conf"
@@ -0,0 +1,14 @@
+#!/bin/bash
+# Entry point for postgres: installs the generated server certificate with
+# the ownership postgres requires and starts it with TLS available. Clients
+# still pick plaintext or TLS themselves through sslmode.
+set -e
+
+install -o postgres -g postgres -m 600 /etc/postgresql/tls/server.key /var/lib/postgresql/server.key
+install -o postgres -g postgres -m 644 /etc/postgresql/tls/server.crt /var/lib/postgresql/server.crt
+
+exec docker-entrypoint.sh postgres \
+    -c ssl=on \
+    -c ssl_cert_file=/var/lib/postgresql/server.crt \
+    -c ssl_key_file=/var/lib/postgresql/server.key \
+    "$@"
@@ -0,0 +1,142 @@
+"""
+Minimal flame graph rendering for py-spy's collapsed ("raw") stacks.
+
+`render_svg` draws a regular flame graph; given a baseline it draws a
+differential one, where each frame keeps the candidate's width and is
+colored by how its share of samples changed (red = grew, blue = shrank).
+"""
+
+import html
+from collections import defaultdict
+
+WIDTH = 1200
+FRAME_HEIGHT = 16
+FONT_SIZE = 11
+CHAR_WIDTH = 6.5  # approximate width of one character at FONT_SIZE
+MIN_WIDTH = 0.3  # frames narrower than this (px) are dropped
+
+
+def read_collapsed(path):
+    """Reads `frame;frame;frame count` lines into {stack tuple: samples}."""
+    stacks = defaultdict(int)
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            stack, _, count = line.rpartition(" ")
+            stacks[tuple(stack.split(";"))] += int(count)
+    return dict(stacks)
+
+
+def merge_processes(stacks):
+    """
+    Drops the per-process/per-thread root frames py-spy adds with
+    --subprocesses, so every gunicorn/uvicorn worker folds into one graph.
+    """
+    merged = defaultdict(int)
+    for stack, count in stacks.items():
+        frames = list(stack)
+        while frames and frames[0].startswith(("process ", "thread ")):
+            frames.pop(0)
+        if frames:
+            merged[tuple(frames)] += count
+    return dict(merged)
+
+
+def write_collapsed(stacks, path):
+    with open(path, "w") as f:
+        for stack, count in sorted(stacks.items()):
+            f.write(f"{';'.join(stack)} {count}\n")
+
+
+def _build_tree(stacks):
+    root = {"name": "all", "value": 0, "children": {}}
+    for stack, count in stacks.items():
+        root["value"] += count
+        node = root
+        for frame in stack:
+            node = node["children"].setdefault(
+                frame, {"name": frame, "value": 0, "children": {}}
+            )
+            node["value"] += count
+    return root
+
+
+def _depth(node):
+    return 1 + max((_depth(c) for c in node["children"].values()), default=0)
+
+
+def _color(name, delta=None):
+    if delta is not None:
+        # delta is the change in share of total samples, clamp at +/-5 points
+        intensity = min(abs(delta) / 0.05, 1.0)
+        fade = int(255 - 175 * intensity)
+        return f"rgb(255,{fade},{fade})" if delta > 0 else f"rgb({fade},{fade},255)"
+    # Stable warm colors per function name
+    h = sum(ord(c) for c in name)
+    return f"rgb(230,{100 + h % 110},{40 + h % 50})"
+
+
+def render_svg(stacks, path, title, baseline=None):
+    """
+    Writes a flame graph of `stacks`. With `baseline` stacks, frames are
+    colored by the change in their share of samples relative to it.
+    """
+    root = _build_tree(stacks)
+    base_root = _build_tree(baseline) if baseline else None
+    total = root["value"] or 1
+    base_total = (base_root["value"] or 1) if base_root else 1
+    depth = _depth(root)
+    height = (depth + 3) * FRAME_HEIGHT
+
+    rects = []
+
+    def draw(node, base_node, x, level):
+        width = node["value"] / total * WIDTH
+        if width < MIN_WIDTH:
+            return
+        delta = None
+        if base_root is not None:
+            base_value = base_node["value"] if base_node else 0
+            delta = node["value"] / total - base_value / base_total
+        y = height - (level + 2) * FRAME_HEIGHT
+        label = node["name"]
+        tooltip = f"{label} ({node['value']} samples, {node['value'] / total:.2%})"
+        if delta is not None:
+            tooltip += f", {delta:+.2%} vs baseline"
+        max_chars = int(width / CHAR_WIDTH)
+        text = (
+            label if len(label) <= max_chars else label[: max(max_chars - 2, 0)] + ".."
+        )
+        rects.append(
+            f"<g><title>{html.escape(tooltip)}</title>"
+            f'<rect x="{x:.2f}" y="{y}" width="{width:.2f}" height="{FRAME_HEIGHT - 1}" '
+            f'fill="{_color(label, delta)}" rx="2"/>'
+            + (
+                f'<text x="{x + 3:.2f}" y="{y + FRAME_HEIGHT - 4}">{html.escape(text)}</text>'
+                if max_chars >= 3
+                else ""
+            )
+            + "</g>"
+        )
+
+        child_x = x
+        for name in sorted(node["children"]):
+            child = node["children"][name]
+            base_child = base_node["children"].get(name) if base_node else None
+            draw(child, base_child, child_x, level + 1)
+            child_x += child["value"] / total * WIDTH
+
+    draw(root, base_root, 0, 0)
+
+    with open(path, "w") as f:
+        f.write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{height}" '
+            f'font-family="Verdana" font-size="{FONT_SIZE}">\n'
+            f'<rect width="100%" height="100%" fill="white"/>\n'
+            f'<text x="{WIDTH / 2}" y="{FRAME_HEIGHT}" text-anchor="middle" '
+            f'font-size="{FONT_SIZE + 3}">{html.escape(title)}</text>\n'
+        )
+        f.write("\n".join(rects))
+        f.write("\n</svg>\n")
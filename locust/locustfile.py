@@ -1,4 +1,91 @@
-from locust import HttpUser, task, between
+import json
+import os
+import random
+import time
+
+import requests
+from locust import HttpUser, task, between, events
+
+# Optional per-request timeout (seconds); 0 = wait forever like before
+REQUEST_TIMEOUT = float(os.getenv("LOCUST_REQUEST_TIMEOUT", "0")) or None
+
+# If set, a per-second timeline (successes, failures, timeouts, latency) is
+# written here when Locust quits. Used by the storm/chaos scenarios.
+TIMELINE_FILE = os.getenv("LOCUST_TIMELINE")
+
+# If LOCUST_BATCH_SIZE is set, users hit the batch endpoint with that many
+# random post ids per request instead of /benchmark/db-test.
+BATCH_SIZE = int(os.getenv("LOCUST_BATCH_SIZE", "0"))
+BATCH_STRATEGY = os.getenv("LOCUST_BATCH_STRATEGY", "any")
+NUM_POSTS = 50_000  # Configured in seed.py
+
+# If LOCUST_STREAM_ROWS is set, users read that many comments from the NDJSON
+# streaming endpoint. Locust reports the full body time; time to first byte
+# is written to LOCUST_STREAM_STATS when Locust quits.
+STREAM_ROWS = int(os.getenv("LOCUST_STREAM_ROWS", "0"))
+STREAM_CHUNK_SIZE = int(os.getenv("LOCUST_STREAM_CHUNK_SIZE", "1000"))
+STREAM_STATS_FILE = os.getenv("LOCUST_STREAM_STATS")
+
+timeline = {"start": None, "buckets": {}}
+ttfb_samples = []
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    timeline["start"] = time.time()
+
+
+@events.request.add_listener
+def on_request(response_time, exception, **kwargs):
+    if not TIMELINE_FILE:
+        return
+    second = int(time.time())
+    bucket = timeline["buckets"].setdefault(
+        second, {"ok": 0, "fail": 0, "timeout": 0, "latencies": []}
+    )
+    if exception is None:
+        bucket["ok"] += 1
+        bucket["latencies"].append(response_time)
+    else:
+        bucket["fail"] += 1
+        if "Timeout" in str(exception):
+            bucket["timeout"] += 1
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+@events.quitting.add_listener
+def write_timeline(environment, **kwargs):
+    if not TIMELINE_FILE:
+        return
+    buckets = []
+    for second, bucket in sorted(timeline["buckets"].items()):
+        latencies = bucket.pop("latencies")
+        bucket["time"] = second
+        bucket["p50"] = percentile(latencies, 50) if latencies else None
+        bucket["p99"] = percentile(latencies, 99) if latencies else None
+        buckets.append(bucket)
+    with open(TIMELINE_FILE, "w") as f:
+        json.dump({"start": timeline["start"], "buckets": buckets}, f)
+
+
+@events.quitting.add_listener
+def write_stream_stats(environment, **kwargs):
+    if not STREAM_STATS_FILE or not ttfb_samples:
+        return
+    with open(STREAM_STATS_FILE, "w") as f:
+        json.dump(
+            {
+                "TTFB Avg (ms)": round(sum(ttfb_samples) / len(ttfb_samples), 2),
+                "TTFB P50 (ms)": round(percentile(ttfb_samples, 50), 2),
+                "TTFB P99 (ms)": round(percentile(ttfb_samples, 99), 2),
+            },
+            f,
+        )
+
 
 class BenchmarkUser(HttpUser):
     # No wait time between tasks to max out the target system
@@ -8,8 +95,53 @@ class BenchmarkUser(HttpUser):
 
     @task
     def db_test(self):
-        with self.client.get("/benchmark/db-test", catch_response=True) as response:
+        if STREAM_ROWS:
+            self.stream_comments()
+            return
+
+        url = name = "/benchmark/db-test"
+        if BATCH_SIZE:
+            ids = ",".join(str(random.randint(1, NUM_POSTS)) for _ in range(BATCH_SIZE))
+            name = "/benchmark/posts"
+            url = f"{name}?ids={ids}&strategy={BATCH_STRATEGY}"
+
+        with self.client.get(
+            url, name=name, catch_response=True, timeout=REQUEST_TIMEOUT
+        ) as response:
             if response.status_code == 200:
                 response.success()
+            elif isinstance(
+                getattr(response, "error", None), requests.exceptions.Timeout
+            ):
+                response.failure(f"Timeout: {response.error}")
             else:
                 response.failure(f"Status code: {response.status_code}")
+
+    def stream_comments(self):
+        name = "/benchmark/comments/stream"
+        url = f"{name}?rows={STREAM_ROWS}&chunk_size={STREAM_CHUNK_SIZE}"
+        start = time.perf_counter()
+        with self.client.get(
+            url, name=name, stream=True, catch_response=True, timeout=REQUEST_TIMEOUT
+        ) as response:
+            if response.status_code != 200:
+                response.failure(f"Status code: {response.status_code}")
+                return
+
+            first_byte, length = None, 0
+            try:
+                for chunk in response.iter_content(chunk_size=None):
+                    if first_byte is None:
+                        first_byte = time.perf_counter()
+                    length += len(chunk)
+            except requests.exceptions.RequestException as e:
+                response.failure(f"Stream error: {e}")
+                return
+
+            # stream=True stops Locust's clock at the headers; report the whole body
+            elapsed = time.perf_counter() - start
+            response.request_meta["response_time"] = elapsed * 1000
+            response.request_meta["response_length"] = length
+            if first_byte is not None:
+                ttfb_samples.append((first_byte - start) * 1000)
+            response.success()
@@ -0,0 +1,55 @@
+#!/bin/sh
+# Runs PGBOUNCER_PROCESSES pgbouncer processes that share listen_port through
+# so_reuseport. Each process gets 1/K of the server pool so the total number
+# of Postgres connections stays the same as a single bouncer.
+set -e
+
+PROCESSES="${PGBOUNCER_PROCESSES:-1}"
+BASE_CONFIG=/etc/pgbouncer/pgbouncer.ini
+
+share() {
+    value=$(sed -n "s/^$1 *= *//p" "$BASE_CONFIG")
+    value=$(( (value + PROCESSES - 1) / PROCESSES ))
+    [ "$value" -lt 1 ] && value=1
+    echo "$value"
+}
+
+DEFAULT_POOL_SIZE=$(share default_pool_size)
+MIN_POOL_SIZE=$(share min_pool_size)
+RESERVE_POOL_SIZE=$(share reserve_pool_size)
+
+PEERS=""
+i=1
+while [ "$i" -le "$PROCESSES" ]; do
+    PEERS="$PEERS$i = host=/tmp/pgbouncer-$i
+"
+    i=$((i + 1))
+done
+
+PIDS=""
+i=1
+while [ "$i" -le "$PROCESSES" ]; do
+    dir="/tmp/pgbouncer-$i"
+    mkdir -p "$dir"
+    # Each process needs its own unix socket dir; peers let cancel requests
+    # reach whichever process owns the query.
+    sed -e '/^default_pool_size/d' -e '/^min_pool_size/d' \
+        -e '/^reserve_pool_size/d' -e '/^unix_socket_dir/d' \
+        "$BASE_CONFIG" > "$dir/pgbouncer.ini"
+    cat >> "$dir/pgbouncer.ini" <<CONFIG
+default_pool_size = $DEFAULT_POOL_SIZE
+min_pool_size = $MIN_POOL_SIZE
+reserve_pool_size = $RESERVE_POOL_SIZE
+unix_socket_dir = $dir
+peer_id = $i
+
+[peers]
+$PEERS
+CONFIG
+    pgbouncer "$dir/pgbouncer.ini" &
+    PIDS="$PIDS $!"
+    i=$((i + 1))
+done
+
+trap 'kill $PIDS' TERM INT
+wait
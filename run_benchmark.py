@@ -1,11 +1,18 @@
+import argparse
+import io
 import subprocess
 import time
 import os
+import re
 import threading
 import json
 import statistics
+import urllib.request
+from itertools import product
 import pandas as pd
 
+import flamegraph
+
 
 # Configuration
 FRAMEWORKS = ["fastapi", "flask", "django"]
@@ -14,6 +21,135 @@ USER_COUNTS = [500, 1000]  # Concurrency levels
 SPAWN_RATE = 50  # Users per second
 RUN_TIME = "60s"  # Test duration per scenario, e.g., "1m" or "60s"
 RESULTS_DIR = "results"
+APP_PORTS = {"fastapi": 8000, "django": 8001, "flask": 8002}
+
+# Request phases exported by each app's /metrics endpoint
+PHASE_LABELS = {
+    "pool_wait": "Pool Wait (ms)",
+    "query": "Query (ms)",
+    "hydration": "Hydration (ms)",
+    "serialization": "Serialization (ms)",
+    "total": "Server Total (ms)",
+}
+
+# Profiling (--profile): py-spy samples every gunicorn/uvicorn worker during Locust
+PROFILE_RATE = 100  # Samples per second
+PROFILES_DIR = os.path.join(RESULTS_DIR, "profiles")
+
+# Network emulation (--network): tc netem delay/jitter/loss per link.
+# "app" is app -> pgbouncer (pooled) or app -> postgres (direct),
+# "pooler" is pgbouncer -> postgres. Delay is added on the client's egress,
+# so it adds that much to every round trip on the link.
+NETWORK_PROFILES = {
+    "none": {},
+    "same-az": {
+        "app": {"delay": 0.5, "jitter": 0.1},
+        "pooler": {"delay": 0.5, "jitter": 0.1},
+    },
+    "cross-az": {
+        "app": {"delay": 2, "jitter": 0.5},
+        "pooler": {"delay": 0.5, "jitter": 0.1},
+    },
+    "cross-region": {
+        "app": {"delay": 30, "jitter": 3, "loss": 0.1},
+        "pooler": {"delay": 0.5, "jitter": 0.1},
+    },
+}
+NETEM_IMAGE = "nicolaka/netshoot"  # Sidecar with tc, joins the target's netns
+
+# Scaling mode: N app replicas behind the nginx load balancer
+SCALING_REPLICA_COUNTS = [1, 2, 4, 8, 16]
+SCALING_USERS = 1000
+SCALING_RESULTS_DIR = os.path.join(RESULTS_DIR, "scaling")
+LOADBALANCER_PORT = 8080
+
+# Pooler mode: K pgbouncer processes sharing port 6432 via so_reuseport.
+# Apps run scaled out so the pooler, not a single app container, is the ceiling.
+POOLER_PROCESS_COUNTS = [1, 2, 4]
+POOLER_CPU_LIMITS = ["0.5", "1.0", "2.0"]
+POOLER_APP_REPLICAS = 4
+POOLER_USERS = 1000
+POOLER_RESULTS_DIR = os.path.join(RESULTS_DIR, "pooler")
+CLOCK_TICKS = 100  # USER_HZ used by /proc/<pid>/stat
+
+# Replica mode: reads routed to N streaming replicas (0 = primary only)
+READ_REPLICA_COUNTS = [0, 1, 2, 3]
+REPLICA_APP_REPLICAS = 4
+REPLICA_USERS = 1000
+# Locust only reads, so a steady insert stream on the primary generates the WAL
+# that replication lag is measured on (without it replay_lag stays NULL/0)
+REPLICA_WRITE_RATE = 50  # Inserts per second
+REPLICA_WRITE_BYTES = 1000  # Payload per insert
+REPLICA_WRITER = "replica-writer"
+REPLICA_RESULTS_DIR = os.path.join(RESULTS_DIR, "replicas")
+
+# Storm mode: cold pools hit by every user at once
+# cold-spawn: fresh app workers/pgbouncer, all users spawned in the first second
+# restart: app restarted under full load at STORM_RESTART_AT (rolling deploy)
+STORM_TYPES = ["cold-spawn", "restart"]
+STORM_USERS = 2000
+STORM_RUN_TIME = "90s"
+STORM_RESTART_AT = 30  # Seconds into the run
+STORM_REQUEST_TIMEOUT = 30  # Longer than query_wait_timeout so its errors surface
+STORM_RESULTS_DIR = os.path.join(RESULTS_DIR, "storm")
+RECOVERY_THRESHOLD = 0.9  # Recovered once successes/s reach 90% of steady state...
+RECOVERY_WINDOW = 5  # ...for this many consecutive seconds
+
+# Fault injection (chaos) configuration
+# pgbouncer-* faults only apply to pooled mode
+CHAOS_FAULTS = [
+    "pgbouncer-restart",
+    "pgbouncer-kill",
+    "pgbouncer-reload",
+    "pgbouncer-pause",
+    "postgres-restart",
+    "packet-drop",
+]
+# App settings for the resilience dimension (pool pre-ping + retry on disconnect)
+CHAOS_RESILIENCE = {
+    "off": {},
+    "on": {"DB_PRE_PING": "1", "DB_RETRY_ATTEMPTS": "2"},
+}
+CHAOS_USERS = 500
+CHAOS_RUN_TIME = "120s"
+CHAOS_AT = 40  # Seconds into the run, after pools are warm
+CHAOS_OUTAGE = 5  # Seconds pgbouncer stays killed/paused or packets are dropped
+CHAOS_REQUEST_TIMEOUT = 30
+CHAOS_RESULTS_DIR = os.path.join(RESULTS_DIR, "chaos")
+
+# TLS configuration: libpq sslmode for app -> first hop ("app") and
+# pgbouncer -> postgres ("server"). app-bouncer only applies to pooled mode.
+TLS_MODES = {
+    "none": {"app": "disable", "server": "disable"},
+    "app-bouncer": {"app": "require", "server": "disable"},
+    "end-to-end": {"app": "require", "server": "require"},
+}
+TLS_USERS = 1000
+TLS_PGBENCH_CLIENTS = 4
+TLS_PGBENCH_TIME = 10  # Seconds of connect-per-transaction pgbench per hop
+PGBENCH_IMAGE = "postgres:16"  # Throwaway client, so TLS work isn't charged to a tier
+TLS_RESULTS_DIR = os.path.join(RESULTS_DIR, "tls")
+
+# Batch endpoint (/benchmark/posts) configuration
+BATCH_SIZES = [1, 10, 50, 100]  # Posts per request
+BATCH_STRATEGIES = {
+    "fastapi": ["serial", "any", "gather"],
+    "flask": ["serial", "any", "pipeline"],
+    "django": ["serial", "any", "pipeline"],
+}
+BATCH_USERS = 200
+BATCH_RESULTS_DIR = os.path.join(RESULTS_DIR, "batch")
+
+# Streaming endpoint (/benchmark/comments/stream) configuration
+STREAM_ROW_COUNTS = [10_000, 100_000]  # Comments per response
+STREAM_CHUNK_SIZE = 1000  # Rows fetched from the cursor / written per chunk
+STREAM_USERS = 50
+STREAM_REQUEST_TIMEOUT = 120
+STREAM_RESULTS_DIR = os.path.join(RESULTS_DIR, "stream")
+
+# Services outside the default profile must be named here so `down` removes them
+COMPOSE_PROFILES = ["scaling", "replicas"]
+OVERRIDE_FILE = "docker-compose.override.yml"
 
 
 def run_command(command, cwd=None):
@@ -25,7 +161,8 @@ def run_command(command, cwd=None):
 def cleanup():
     """Stops and removes all containers."""
     print("Cleaning up containers...")
-    subprocess.run("docker-compose down -v", shell=True, check=False)
+    profiles = " ".join(f"--profile {p}" for p in COMPOSE_PROFILES)
+    subprocess.run(f"docker-compose {profiles} down -v", shell=True, check=False)
 
 
 def wait_for_service(service_name, port, timeout=60):
@@ -36,6 +173,11 @@ def wait_for_service(service_name, port, timeout=60):
     time.sleep(30)  # Increased wait for DB init
 
 
+def ensure_certs():
+    """Generates the local CA and server certificate postgres/pgbouncer use for TLS."""
+    run_command("sh tls/generate_certs.sh")
+
+
 def ensure_db_ready():
     """Ensure Postgres is running and Seeded."""
     print("Starting Postgres...")
@@ -54,6 +196,197 @@ def ensure_db_ready():
         run_command("./venv/bin/python database/seed.py")
 
 
+def write_override(services):
+    """
+    Writes per-scenario service overrides.
+    JSON is valid YAML, so docker-compose picks the file up as-is.
+    """
+    with open(OVERRIDE_FILE, "w") as f:
+        json.dump({"version": "3.8", "services": services}, f, indent=2)
+
+
+def remove_override():
+    if os.path.exists(OVERRIDE_FILE):
+        os.remove(OVERRIDE_FILE)
+
+
+def service_containers(service_name):
+    """Returns the container names of every replica of a compose service."""
+    cmd = [
+        "docker",
+        "ps",
+        "--filter",
+        f"label=com.docker.compose.service={service_name}",
+        "--format",
+        "{{.Names}}",
+    ]
+    return sorted(subprocess.check_output(cmd).decode().split())
+
+
+def psql_value(query, container="postgres"):
+    """
+    Runs a single-value query against the primary and returns it as text.
+    Connects to the `postgres` database: every sample is a new session, and
+    keeping them out of benchmark_db keeps them out of its connection and
+    session counts (the stats views are cluster-wide).
+    """
+    cmd = [
+        "docker",
+        "exec",
+        container,
+        "psql",
+        "-U",
+        "postgres",
+        "-d",
+        "postgres",
+        "-tAc",
+        query,
+    ]
+    return subprocess.check_output(cmd, stderr=subprocess.DEVNULL).decode().strip()
+
+
+def sample_pg_connections():
+    """Client backends connected to benchmark_db (i.e. server connections)."""
+    return int(
+        psql_value(
+            "SELECT count(*) FROM pg_stat_activity "
+            "WHERE backend_type = 'client backend' AND datname = 'benchmark_db'"
+        )
+    )
+
+
+def sample_pg_sessions():
+    """Sessions ever established to benchmark_db; each one is a forked backend."""
+    return int(
+        psql_value(
+            "SELECT sessions FROM pg_stat_database WHERE datname = 'benchmark_db'"
+        )
+    )
+
+
+def fork_rate(series):
+    """Backends forked in total and the peak per-second rate, from pg_sessions samples."""
+    if len(series) < 2:
+        return 0, 0
+    rates = [
+        (v2 - v1) / (t2 - t1)
+        for (t1, v1), (t2, v2) in zip(series, series[1:])
+        if t2 > t1
+    ]
+    return series[-1][1] - series[0][1], max(rates, default=0)
+
+
+def sample_replay_lag_ms():
+    """Worst replay lag across streaming replicas, as reported by the primary."""
+    return float(
+        psql_value(
+            "SELECT coalesce(max(extract(epoch FROM replay_lag)) * 1000, 0) "
+            "FROM pg_stat_replication"
+        )
+    )
+
+
+def sample_replay_lag_bytes():
+    """WAL bytes the slowest replica still has to replay."""
+    return int(
+        psql_value(
+            "SELECT coalesce(max(pg_wal_lsn_diff(pg_current_wal_lsn(), replay_lsn)), 0) "
+            "FROM pg_stat_replication"
+        )
+    )
+
+
+def start_write_load(duration):
+    """
+    Starts a throwaway pgbench container inserting REPLICA_WRITE_RATE rows/s
+    into replica_writes on the primary for `duration` seconds.
+    """
+    setup = (
+        "CREATE TABLE IF NOT EXISTS replica_writes "
+        "(id bigserial PRIMARY KEY, payload text, created_at timestamptz DEFAULT now())"
+    )
+    script = (
+        "INSERT INTO replica_writes (payload) "
+        f"VALUES (repeat(chr(120), {REPLICA_WRITE_BYTES}));"
+    )
+    pgbench = (
+        f"pgbench -n -f /tmp/write.sql -c 1 -R {REPLICA_WRITE_RATE} -T {duration} "
+        "-h postgres -U postgres benchmark_db"
+    )
+    run_command(
+        f"docker run -d --rm --name {REPLICA_WRITER} "
+        f"--network {container_network('postgres')} -e PGPASSWORD=password "
+        f"{PGBENCH_IMAGE} sh -c \"echo '{script}' > /tmp/write.sql && "
+        f"psql -h postgres -U postgres -d benchmark_db -c '{setup}' && {pgbench}\""
+    )
+
+
+def stop_write_load():
+    subprocess.run(
+        f"docker rm -f {REPLICA_WRITER}",
+        shell=True,
+        check=False,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def container_ip(container):
+    cmd = [
+        "docker",
+        "inspect",
+        "-f",
+        "{{range .NetworkSettings.Networks}}{{.IPAddress}}{{end}}",
+        container,
+    ]
+    return subprocess.check_output(cmd).decode().strip()
+
+
+def tc(container, args, check=True):
+    """Runs `tc` inside a container's network namespace via a NET_ADMIN sidecar."""
+    command = (
+        f"docker run --rm --net container:{container} --cap-add NET_ADMIN "
+        f"{NETEM_IMAGE} tc {args}"
+    )
+    if check:
+        run_command(command)
+    else:
+        subprocess.run(command, shell=True, check=False, stderr=subprocess.DEVNULL)
+
+
+def apply_netem(container, target, delay=0, jitter=0, loss=0):
+    """
+    Adds delay/jitter/loss to packets from `container` to `target` only.
+    A prio qdisc keeps all other traffic on the default bands and a u32
+    filter sends the target's IP to band 3, which carries the netem qdisc.
+    """
+    clear_netem(container)
+    netem = f"delay {delay}ms" + (f" {jitter}ms" if jitter else "")
+    if loss:
+        netem += f" loss {loss}%"
+
+    tc(container, "qdisc add dev eth0 root handle 1: prio")
+    tc(container, f"qdisc add dev eth0 parent 1:3 handle 30: netem {netem}")
+    tc(
+        container,
+        "filter add dev eth0 protocol ip parent 1:0 prio 3 u32 "
+        f"match ip dst {container_ip(target)}/32 flowid 1:3",
+    )
+
+
+def clear_netem(container):
+    tc(container, "qdisc del dev eth0 root", check=False)
+
+
+def apply_network_profile(network, service_name, pool_mode):
+    """Shapes the app -> (pgbouncer|postgres) and pgbouncer -> postgres links."""
+    profile = NETWORK_PROFILES[network]
+    if "app" in profile:
+        target = "pgbouncer" if pool_mode == "pooled" else "postgres"
+        apply_netem(service_name, target, **profile["app"])
+    if "pooler" in profile and pool_mode == "pooled":
+        apply_netem("pgbouncer", "postgres", **profile["pooler"])
+
+
 def monitor_resources(stop_event, containers, results):
     """
     Monitors Docker container resources in a background thread.
@@ -103,38 +436,422 @@ def monitor_resources(stop_event, containers, results):
             results[c] = {"avg_cpu": 0, "avg_mem": 0}
 
 
-def run_scenario(framework, pool_mode, users):
+def process_cpu_ticks(container, process_name):
+    """Returns {pid: utime + stime} for every `process_name` process in a container."""
+    script = (
+        f"for p in $(pidof {process_name}); do "
+        'echo $p $(cut -d" " -f14,15 /proc/$p/stat); done'
+    )
+    output = subprocess.check_output(["docker", "exec", container, "sh", "-c", script])
+    ticks = {}
+    for line in output.decode().strip().splitlines():
+        pid, utime, stime = line.split()
+        ticks[pid] = int(utime) + int(stime)
+    return ticks
+
+
+def worker_peak_rss_mb(container):
+    """
+    Peak resident memory (VmHWM) of the app's worker processes, i.e. every
+    process but the gunicorn master (PID 1), in MB.
+    """
+    script = (
+        "awk '/^Name:/ {name=$2} /^VmHWM:/ "
+        '{split(FILENAME, path, "/"); print path[3], name, $2}\' /proc/[0-9]*/status'
+    )
+    output = subprocess.check_output(["docker", "exec", container, "sh", "-c", script])
+    peaks = [
+        int(kb) / 1024
+        for pid, name, kb in (line.split() for line in output.decode().splitlines())
+        if pid != "1" and name not in ("sh", "awk")
+    ]
+    return round(max(peaks, default=0), 1)
+
+
+def monitor_process_cpu(stop_event, container, process_name, results):
+    """
+    Tracks CPU of each process inside a container (e.g. every pgbouncer).
+    docker stats only reports the container total, which hides whether one
+    single-threaded process is pinned at 100%.
+    """
+    usage = {}
+    previous, previous_time = {}, time.time()
+
+    while not stop_event.is_set():
+        time.sleep(1)
+        try:
+            current, current_time = (
+                process_cpu_ticks(container, process_name),
+                time.time(),
+            )
+        except Exception as e:
+            print(f"Process Monitor Warning: {e}")
+            continue
+
+        elapsed = current_time - previous_time
+        for pid, ticks in current.items():
+            if pid in previous:
+                cpu = (ticks - previous[pid]) / CLOCK_TICKS / elapsed * 100
+                usage.setdefault(pid, []).append(cpu)
+        previous, previous_time = current, current_time
+
+    for pid, values in usage.items():
+        results[pid] = {"avg_cpu": statistics.mean(values), "max_cpu": max(values)}
+
+
+def monitor_samples(stop_event, samplers, results):
+    """
+    Polls scalar samplers (e.g. Postgres connection count) once per second.
+    stores avg/max and the (timestamp, value) series per sampler in `results` dict.
+    """
+    samples = {name: [] for name in samplers}
+
+    while not stop_event.is_set():
+        for name, sampler in samplers.items():
+            try:
+                samples[name].append((time.time(), sampler()))
+            except Exception as e:
+                print(f"Sampler Warning ({name}): {e}")
+        time.sleep(1)
+
+    for name, series in samples.items():
+        values = [value for _, value in series]
+        if values:
+            results[name] = {
+                "avg": statistics.mean(values),
+                "max": max(values),
+                "series": series,
+            }
+        else:
+            results[name] = {"avg": 0, "max": 0, "series": []}
+
+
+def start_monitor(containers, samplers=None):
+    """Starts the resource (and optional sampler) threads for a scenario."""
+    stop_event = threading.Event()
+    resource_results = {}
+    sample_results = {}
+    threads = [
+        threading.Thread(
+            target=monitor_resources,
+            args=(stop_event, containers, resource_results),
+        )
+    ]
+    if samplers:
+        threads.append(
+            threading.Thread(
+                target=monitor_samples,
+                args=(stop_event, samplers, sample_results),
+            )
+        )
+    for thread in threads:
+        thread.start()
+    return stop_event, threads, resource_results, sample_results
+
+
+def stop_monitor(stop_event, threads):
+    stop_event.set()
+    for thread in threads:
+        thread.join()
+
+
+def scrape_phase_metrics(port):
+    """
+    Reads the app's Prometheus /metrics and returns the mean time per
+    request phase (ms), the number of DB connections it opened and its
+    unhandled errors (PgBouncer query_wait_timeout counted separately).
+    """
+    with urllib.request.urlopen(f"http://localhost:{port}/metrics", timeout=10) as r:
+        text = r.read().decode()
+
+    sums, counts, errors = {}, {}, {}
+    connections = 0
+    for line in text.splitlines():
+        match = re.match(
+            r'app_request_phase_seconds_(sum|count)\{phase="(\w+)"\} (\S+)', line
+        )
+        error = re.match(r'app_request_errors_total\{reason="(\w+)"\} (\S+)', line)
+        if match:
+            kind, phase, value = match.groups()
+            (sums if kind == "sum" else counts)[phase] = float(value)
+        elif error:
+            errors[error.group(1)] = int(float(error.group(2)))
+        elif line.startswith("app_db_connections_opened_total "):
+            connections = int(float(line.split()[1]))
+
+    metrics = {
+        label: round(sums[phase] / counts[phase] * 1000, 2)
+        for phase, label in PHASE_LABELS.items()
+        if counts.get(phase)
+    }
+    metrics["DB Connections Opened"] = connections
+    metrics["App Errors"] = sum(errors.values())
+    metrics["query_wait_timeout Errors"] = errors.get("query_wait_timeout", 0)
+    return metrics
+
+
+def pgbouncer_stats():
+    """
+    benchmark_db's cumulative counters from PgBouncer's SHOW STATS (times in
+    microseconds). With several so_reuseport processes this reaches only one.
+    """
+    cmd = (
+        "docker exec -e PGPASSWORD=password postgres "
+        "psql -h pgbouncer -p 6432 -U postgres -d pgbouncer --csv -c 'SHOW STATS'"
+    )
+    stats = pd.read_csv(io.StringIO(subprocess.check_output(cmd, shell=True).decode()))
+    row = stats[stats["database"] == "benchmark_db"].iloc[0]
+    return {name: int(row[name]) for name in stats.columns if name.startswith("total_")}
+
+
+def pooler_wait_metrics(before, after, requests):
+    """
+    Time clients spent queued in PgBouncer for a server connection between
+    two SHOW STATS snapshots. PgBouncer assigns a server connection only when
+    a transaction's first statement arrives, so the apps time this wait as
+    part of `query`; per request it can be set against Query (ms).
+    """
+    wait_ms = (after["total_wait_time"] - before["total_wait_time"]) / 1000
+    xacts = after["total_xact_count"] - before["total_xact_count"]
+    return {
+        "Pooler Wait (ms)": round(wait_ms / requests, 2) if requests else 0,
+        "Pooler Wait / Xact (ms)": round(wait_ms / xacts, 2) if xacts else 0,
+    }
+
+
+def parse_duration(value):
+    """Converts a Locust run time ("60s", "2m", "1h") to seconds."""
+    units = {"s": 1, "m": 60, "h": 3600}
+    if value[-1] in units:
+        return int(value[:-1]) * units[value[-1]]
+    return int(value)
+
+
+def start_profiler(service_name, duration):
+    """
+    Starts py-spy against the gunicorn master (PID 1) and all its workers.
+    Needs SYS_PTRACE on the app container; runs for `duration` seconds.
+    """
+    cmd = [
+        "docker-compose",
+        "exec",
+        "-T",
+        service_name,
+        "py-spy",
+        "record",
+        "--pid",
+        "1",
+        "--subprocesses",
+        "--nonblocking",
+        "--rate",
+        str(PROFILE_RATE),
+        "--duration",
+        str(duration),
+        "--format",
+        "raw",
+        "--output",
+        "/tmp/profile.txt",
+    ]
+    print(f"Starting Profiler: {' '.join(cmd)}")
+    return subprocess.Popen(cmd)
+
+
+def collect_profile(service_name, profiler, filename):
+    """Waits for py-spy, then saves merged collapsed stacks and a flame graph."""
+    profiler.wait()
+    raw_file = os.path.join(PROFILES_DIR, f"{filename}.raw")
+    with open(raw_file, "wb") as f:
+        subprocess.check_call(
+            ["docker-compose", "exec", "-T", service_name, "cat", "/tmp/profile.txt"],
+            stdout=f,
+        )
+
+    stacks = flamegraph.merge_processes(flamegraph.read_collapsed(raw_file))
+    flamegraph.write_collapsed(
+        stacks, os.path.join(PROFILES_DIR, f"{filename}.collapsed")
+    )
+    flamegraph.render_svg(
+        stacks, os.path.join(PROFILES_DIR, f"{filename}.svg"), filename
+    )
+
+
+def generate_profile_diffs(networks=("none",)):
+    """Renders pooled-vs-direct differential flame graphs per framework and load."""
+    for framework in FRAMEWORKS:
+        for users, network in product(USER_COUNTS, networks):
+            suffix = network_suffix(network)
+            direct, pooled = (
+                os.path.join(
+                    PROFILES_DIR, f"{framework}_{mode}_{users}u{suffix}.collapsed"
+                )
+                for mode in ("direct", "pooled")
+            )
+            if not (os.path.exists(direct) and os.path.exists(pooled)):
+                continue
+            name = f"{framework}_{users}u{suffix}_pooled_vs_direct"
+            flamegraph.render_svg(
+                flamegraph.read_collapsed(pooled),
+                os.path.join(PROFILES_DIR, f"{name}.svg"),
+                f"{framework} {users}u: pooled vs direct (red = more time when pooled)",
+                baseline=flamegraph.read_collapsed(direct),
+            )
+            print(f"Saved {name}.svg")
+
+
+def run_locust(
+    host_url, users, prefix, spawn_rate=SPAWN_RATE, run_time=RUN_TIME, env=None
+):
+    """
+    Runs Locust headless and writes its CSVs under `prefix`.
+    `env` passes settings to the locustfile (e.g. LOCUST_TIMELINE).
+    """
+    cmd = [
+        "./venv/bin/locust",
+        "-f",
+        "locust/locustfile.py",
+        "--headless",
+        "-u",
+        str(users),
+        "-r",
+        str(spawn_rate),
+        "--run-time",
+        run_time,
+        "--host",
+        host_url,
+        "--csv",
+        prefix,
+        "--only-summary",
+    ]
+
+    print(f"Starting Locust: {' '.join(cmd)}")
+    subprocess.check_call(cmd, env={**os.environ, **(env or {})})
+
+
+def analyze_timeline(path, event_time=None):
+    """
+    Recovery metrics from a Locust timeline, relative to `event_time`
+    (epoch seconds of the storm or fault; defaults to the start of the run).
+    Steady state is the median successes/s over the last third of the run.
+    """
+    with open(path, "r") as f:
+        timeline = json.load(f)
+
+    by_time = {b["time"]: b for b in timeline["buckets"]}
+    if not by_time:
+        return {}
+    empty = {"ok": 0, "fail": 0, "timeout": 0, "p99": None}
+    seconds = range(min(by_time), max(by_time) + 1)
+    buckets = [{**empty, **by_time.get(t, {}), "time": t} for t in seconds]
+
+    mid_run = event_time is not None
+    event_time = event_time or timeline["start"]
+    tail = buckets[len(buckets) * 2 // 3 :]
+    steady = statistics.median(b["ok"] for b in tail)
+    after = [b for b in buckets if b["time"] >= int(event_time)]
+
+    first_success = next((b["time"] for b in after if b["ok"]), None)
+    recovering = after
+    if mid_run:
+        # The event's own second (and a graceful stop) still holds successes
+        # from before the outage: first success counts from the first second
+        # with none, recovery from the first second with none or with errors.
+        # A run that never breaks recovers immediately.
+        outage = next((i for i, b in enumerate(after) if not b["ok"]), None)
+        first_success = event_time
+        if outage is not None:
+            first_success = next((b["time"] for b in after[outage:] if b["ok"]), None)
+        disrupted = next(
+            (i for i, b in enumerate(after) if not b["ok"] or b["fail"]), None
+        )
+        recovering = after[disrupted:] if disrupted is not None else []
+
+    recovered = None if recovering else event_time
+    for i, b in enumerate(recovering):
+        window = recovering[i : i + RECOVERY_WINDOW]
+        if len(window) == RECOVERY_WINDOW and all(
+            w["ok"] >= RECOVERY_THRESHOLD * steady and w["fail"] <= 0.01 * w["ok"]
+            for w in window
+        ):
+            recovered = b["time"]
+            break
+
+    total = sum(b["ok"] + b["fail"] for b in buckets) or 1
+    return {
+        "Steady RPS": steady,
+        "Time to First Success (s)": (
+            round(max(first_success - event_time, 0), 1) if first_success else None
+        ),
+        "Recovery Time (s)": (
+            round(max(recovered - event_time, 0), 1) if recovered else None
+        ),
+        "Error Rate (%)": round(sum(b["fail"] for b in buckets) / total * 100, 2),
+        "Timeout Rate (%)": round(sum(b["timeout"] for b in buckets) / total * 100, 2),
+    }
+
+
+def save_scenario(prefix, dims, containers, metrics=None):
+    """
+    Records a scenario's parameters and extra metrics next to its Locust CSVs.
+    `containers` maps a role (db/app) to the container names monitored for it.
+    """
+    with open(f"{prefix}_scenario.json", "w") as f:
+        json.dump({"dims": dims, "containers": containers, "metrics": metrics or {}}, f)
+
+
+def network_suffix(network):
+    """Filename suffix for a network profile; unshaped runs keep the old names."""
+    return "" if network == "none" else f"_{network}"
+
+
+def network_rtt(network):
+    """Round-trip time added on the app's link to the database tier (ms)."""
+    return NETWORK_PROFILES[network].get("app", {}).get("delay", 0)
+
+
+def standard_dims(framework, pool_mode, users, network="none"):
+    """A standard-mode scenario's dimensions (also used for pre-scenario.json runs)."""
+    return {
+        "Framework": framework,
+        "Pool Mode": pool_mode,
+        "Network RTT (ms)": network_rtt(network),
+        "Network": network,
+        "Users": users,
+    }
+
+
+def run_scenario(framework, pool_mode, users, profile=False, network="none"):
     """Runs a single benchmark scenario."""
-    filename = f"{framework}_{pool_mode}_{users}u"
-    result_file = os.path.join(RESULTS_DIR, f"{filename}_stats.csv")
-    resource_file = os.path.join(RESULTS_DIR, f"{filename}_resources.json")
+    filename = f"{framework}_{pool_mode}_{users}u{network_suffix(network)}"
+    prefix = os.path.join(RESULTS_DIR, filename)
+    result_file = f"{prefix}_stats.csv"
+    resource_file = f"{prefix}_resources.json"
 
     if os.path.exists(result_file):
         print(f"Skipping {filename}: Results already exist.")
         return
 
-    print(f"--- Running Scenario: {framework} | {pool_mode} | {users} Users ---")
+    print(
+        f"--- Running Scenario: {framework} | {pool_mode} | {users} Users | "
+        f"Network: {network} ---"
+    )
 
     service_name = f"{framework}-app"
+    port = APP_PORTS[framework]
+    stop_event = threads = None
 
     try:
         # 1. Start Infrastructure
-        if os.path.exists("docker-compose.override.yml"):
-            os.remove("docker-compose.override.yml")
+        remove_override()
 
         # Clean start for App
         run_command(f"docker-compose stop {service_name}")
         run_command(f"docker-compose rm -f {service_name}")
 
-        with open("docker-compose.override.yml", "w") as f:
-            val = "1" if pool_mode == "pooled" else "0"
-            f.write(f"""
-version: '3.8'
-services:
-  {service_name}:
-    environment:
-      USE_CONNECTION_POOLING: '{val}'
-""")
+        val = "1" if pool_mode == "pooled" else "0"
+        app_override = {"environment": {"USE_CONNECTION_POOLING": val}}
+        if profile:
+            app_override["cap_add"] = ["SYS_PTRACE"]
+        write_override({service_name: app_override})
 
         if pool_mode == "pooled":
             run_command("docker-compose up -d pgbouncer", cwd=None)
@@ -142,146 +859,1285 @@ services:
         run_command(f"docker-compose up -d {service_name}")
 
         # Wait for service to be ready
-        wait_for_service(
-            service_name,
-            8000
-            if framework == "fastapi"
-            else (8001 if framework == "django" else 8002),
-        )
+        wait_for_service(service_name, port)
+        apply_network_profile(network, service_name, pool_mode)
 
         # 2. Start Resource Monitor
-        stop_event = threading.Event()
-        resource_results = {}
-        target_containers = ["postgres", service_name]
+        containers = {"db": ["postgres"], "app": [service_name]}
+        stop_event, threads, resource_results, _ = start_monitor(
+            containers["db"] + containers["app"]
+        )
 
-        monitor_thread = threading.Thread(
-            target=monitor_resources,
-            args=(stop_event, target_containers, resource_results),
-        )
-        monitor_thread.start()
-
-        # 3. Run Locust
-        port = (
-            8000 if framework == "fastapi" else 8001 if framework == "django" else 8002
-        )
-        host_url = f"http://localhost:{port}"
-
-        cmd = [
-            "./venv/bin/locust",
-            "-f",
-            "locust/locustfile.py",
-            "--headless",
-            "-u",
-            str(users),
-            "-r",
-            str(SPAWN_RATE),
-            "--run-time",
-            RUN_TIME,
-            "--host",
-            host_url,
-            "--csv",
-            f"{RESULTS_DIR}/{filename}",
-            "--only-summary",
-        ]
-
-        print(f"Starting Locust: {' '.join(cmd)}")
-        subprocess.check_call(cmd)
+        # 3. Run Locust (and the profiler for the same window)
+        pooler_before = None
+        if pool_mode == "pooled":
+            try:
+                pooler_before = pgbouncer_stats()
+            except Exception as e:
+                print(f"Metrics Warning: {e}")
+
+        profiler = (
+            start_profiler(service_name, parse_duration(RUN_TIME)) if profile else None
+        )
+        run_locust(f"http://localhost:{port}", users, prefix)
 
         # 4. Stop Monitor and Save
-        stop_event.set()
-        monitor_thread.join()
+        stop_monitor(stop_event, threads)
 
         with open(resource_file, "w") as f:
             json.dump(resource_results, f)
 
+        if profiler:
+            try:
+                collect_profile(service_name, profiler, filename)
+            except Exception as e:
+                print(f"Profiler Warning: {e}")
+
+        # 5. Server-side latency breakdown
+        try:
+            phase_metrics = scrape_phase_metrics(port)
+        except Exception as e:
+            print(f"Metrics Warning: {e}")
+            phase_metrics = {}
+
+        # PgBouncer queueing, which the apps can only see as query time
+        if pooler_before is not None:
+            try:
+                stats = pd.read_csv(result_file)
+                requests = stats[stats["Name"] == "Aggregated"].iloc[0]["Request Count"]
+                phase_metrics.update(
+                    pooler_wait_metrics(pooler_before, pgbouncer_stats(), requests)
+                )
+            except Exception as e:
+                print(f"Metrics Warning: {e}")
+
+        save_scenario(
+            prefix,
+            standard_dims(framework, pool_mode, users, network),
+            containers,
+            phase_metrics,
+        )
+
     except Exception as e:
         print(f"FAILED Scenario {filename}: {e}")
-        stop_event.set()  # ensure thread stops
+        if stop_event:
+            stop_monitor(stop_event, threads)  # ensure thread stops
     finally:
-        if os.path.exists("docker-compose.override.yml"):
-            os.remove("docker-compose.override.yml")
+        remove_override()
+        # The app container is recreated next time, pgbouncer is not
+        if NETWORK_PROFILES[network] and pool_mode == "pooled":
+            clear_netem("pgbouncer")
+
+
+def start_single_app(framework, pool_mode, environment=None, pgbouncer_override=None):
+    """
+    Recreates one app container (and pgbouncer in pooled mode, so no state
+    leaks between scenarios) and returns the containers map to monitor.
+    `environment` adds app environment variables, `pgbouncer_override` a
+    compose override for pgbouncer.
+    """
+    service_name = f"{framework}-app"
+    val = "1" if pool_mode == "pooled" else "0"
+    services = {
+        service_name: {
+            "environment": {"USE_CONNECTION_POOLING": val, **(environment or {})}
+        }
+    }
+    if pgbouncer_override:
+        services["pgbouncer"] = pgbouncer_override
+    write_override(services)
+
+    containers = {"db": ["postgres"], "app": [service_name]}
+    if pool_mode == "pooled":
+        run_command("docker-compose up -d --force-recreate pgbouncer")
+        containers["pooler"] = ["pgbouncer"]
+    run_command(f"docker-compose up -d --force-recreate {service_name}")
+    wait_for_service(service_name, APP_PORTS[framework])
+    return containers
+
+
+def start_scaled_app(
+    framework, pool_mode, replicas, overrides=None, app_environment=None
+):
+    """
+    Starts `replicas` copies of an app behind the load balancer.
+    `overrides` adds compose overrides for other services (e.g. pgbouncer),
+    `app_environment` extra environment variables for the app itself.
+    """
+    service_name = f"{framework}-replica"
+    remove_override()
+
+    # Replicas and the balancer are recreated so nginx resolves the new set
+    run_command(f"docker-compose rm -fs {service_name} loadbalancer")
+
+    val = "1" if pool_mode == "pooled" else "0"
+    environment = {"USE_CONNECTION_POOLING": val}
+    environment.update(app_environment or {})
+    services = {
+        service_name: {"environment": environment},
+        "loadbalancer": {
+            "environment": {"APP_UPSTREAM": f"{service_name}:{APP_PORTS[framework]}"}
+        },
+    }
+    services.update(overrides or {})
+    write_override(services)
+
+    if pool_mode == "pooled":
+        run_command("docker-compose up -d pgbouncer")
+
+    run_command(
+        f"docker-compose up -d --scale {service_name}={replicas} {service_name}"
+    )
+    wait_for_service(service_name, APP_PORTS[framework])
+    run_command("docker-compose up -d loadbalancer")
+
+
+def stop_scaled_app(framework):
+    remove_override()
+    subprocess.run(
+        f"docker-compose rm -fs {framework}-replica loadbalancer",
+        shell=True,
+        check=False,
+    )
+
+
+def run_scaling_scenario(framework, pool_mode, replicas, users=SCALING_USERS):
+    """
+    Runs N replicas of an app behind the load balancer.
+    Each replica keeps its own in-process pool, so direct mode opens
+    N times as many Postgres connections as a single container.
+    """
+    filename = f"{framework}_{pool_mode}_{users}u_{replicas}r"
+    prefix = os.path.join(SCALING_RESULTS_DIR, filename)
+
+    if os.path.exists(f"{prefix}_stats.csv"):
+        print(f"Skipping {filename}: Results already exist.")
+        return
+
+    print(
+        f"--- Running Scaling Scenario: {framework} | {pool_mode} | "
+        f"{replicas} Replicas | {users} Users ---"
+    )
+
+    service_name = f"{framework}-replica"
+    stop_event = threads = None
+
+    try:
+        start_scaled_app(framework, pool_mode, replicas)
+
+        containers = {"db": ["postgres"], "app": service_containers(service_name)}
+        stop_event, threads, resource_results, sample_results = start_monitor(
+            containers["db"] + containers["app"],
+            samplers={"pg_connections": sample_pg_connections},
+        )
+
+        run_locust(f"http://localhost:{LOADBALANCER_PORT}", users, prefix)
+
+        stop_monitor(stop_event, threads)
+
+        with open(f"{prefix}_resources.json", "w") as f:
+            json.dump(resource_results, f)
+
+        connections = sample_results["pg_connections"]
+        save_scenario(
+            prefix,
+            {
+                "Framework": framework,
+                "Pool Mode": pool_mode,
+                "Replicas": replicas,
+                "Users": users,
+            },
+            containers,
+            {
+                "Avg DB Connections": round(connections["avg"], 1),
+                "Peak DB Connections": connections["max"],
+            },
+        )
+
+    except Exception as e:
+        print(f"FAILED Scenario {filename}: {e}")
+        if stop_event:
+            stop_monitor(stop_event, threads)
+    finally:
+        stop_scaled_app(framework)
+
+
+def run_pooler_scenario(
+    framework, processes, cpus, replicas=POOLER_APP_REPLICAS, users=POOLER_USERS
+):
+    """
+    Runs K pgbouncer processes sharing port 6432 (so_reuseport) under a
+    pooler CPU limit, with the app scaled out to push the pooler to its ceiling.
+    """
+    filename = f"{framework}_pooled_{users}u_{replicas}r_{processes}p_{cpus}cpu"
+    prefix = os.path.join(POOLER_RESULTS_DIR, filename)
+
+    if os.path.exists(f"{prefix}_stats.csv"):
+        print(f"Skipping {filename}: Results already exist.")
+        return
+
+    print(
+        f"--- Running Pooler Scenario: {framework} | {processes} PgBouncer Processes | "
+        f"{cpus} CPUs | {users} Users ---"
+    )
+
+    stop_event = threads = None
+
+    try:
+        # Recreate the bouncer so the process count and CPU limit take effect
+        run_command("docker-compose rm -fs pgbouncer")
+        start_scaled_app(
+            framework,
+            "pooled",
+            replicas,
+            {
+                "pgbouncer": {
+                    "entrypoint": ["/bin/sh", "/etc/pgbouncer/start_multi.sh"],
+                    "environment": {"PGBOUNCER_PROCESSES": str(processes)},
+                    "deploy": {"resources": {"limits": {"cpus": cpus}}},
+                }
+            },
+        )
+
+        containers = {
+            "db": ["postgres"],
+            "pooler": ["pgbouncer"],
+            "app": service_containers(f"{framework}-replica"),
+        }
+        stop_event, threads, resource_results, _ = start_monitor(
+            containers["db"] + containers["pooler"] + containers["app"]
+        )
+        process_results = {}
+        threads.append(
+            threading.Thread(
+                target=monitor_process_cpu,
+                args=(stop_event, "pgbouncer", "pgbouncer", process_results),
+            )
+        )
+        threads[-1].start()
+
+        run_locust(f"http://localhost:{LOADBALANCER_PORT}", users, prefix)
+
+        stop_monitor(stop_event, threads)
+
+        with open(f"{prefix}_resources.json", "w") as f:
+            json.dump(resource_results, f)
+
+        per_process = [p["avg_cpu"] for p in process_results.values()] or [0]
+        save_scenario(
+            prefix,
+            {
+                "Framework": framework,
+                "PgBouncer Processes": processes,
+                "PgBouncer CPUs": float(cpus),
+                "Replicas": replicas,
+                "Users": users,
+            },
+            containers,
+            {
+                "Pooler CPU/Process (%)": round(statistics.mean(per_process), 1),
+                "Busiest Process CPU (%)": round(max(per_process), 1),
+                "Peak Process CPU (%)": round(
+                    max([p["max_cpu"] for p in process_results.values()] or [0]), 1
+                ),
+            },
+        )
+
+    except Exception as e:
+        print(f"FAILED Scenario {filename}: {e}")
+        if stop_event:
+            stop_monitor(stop_event, threads)
+    finally:
+        stop_scaled_app(framework)
+        # Back to the single-process bouncer for whatever runs next
+        subprocess.run("docker-compose rm -fs pgbouncer", shell=True, check=False)
+
+
+def wait_for_replicas(count, timeout=300):
+    """Waits until `count` replicas have finished their base backup and are streaming."""
+    print(f"Waiting for {count} streaming replicas...")
+    deadline = time.time() + timeout
+    streaming = 0
+    while time.time() < deadline:
+        try:
+            streaming = int(
+                psql_value(
+                    "SELECT count(*) FROM pg_stat_replication WHERE state = 'streaming'"
+                )
+            )
+            if streaming >= count:
+                return
+        except Exception:
+            pass
+        time.sleep(2)
+    raise Exception(f"Only {streaming} of {count} replicas are streaming")
+
+
+def start_read_replicas(count, pool_mode):
+    """
+    Scales the streaming replicas (and, when pooled, one pgbouncer per replica).
+    `--no-deps` keeps compose from resetting the replica count when
+    pgbouncer-replica pulls in its dependency.
+    """
+    if count == 0:
+        run_command("docker-compose rm -fs postgres-replica pgbouncer-replica")
+        return
+
+    run_command(
+        f"docker-compose up -d --no-deps --scale postgres-replica={count} postgres-replica"
+    )
+    wait_for_replicas(count)
+
+    if pool_mode == "pooled":
+        run_command(
+            "docker-compose up -d --no-deps "
+            f"--scale pgbouncer-replica={count} pgbouncer-replica"
+        )
+    else:
+        run_command("docker-compose rm -fs pgbouncer-replica")
+
+
+def run_replica_scenario(
+    framework,
+    pool_mode,
+    read_replicas,
+    replicas=REPLICA_APP_REPLICAS,
+    users=REPLICA_USERS,
+):
+    """
+    Routes the apps' reads to `read_replicas` streaming replicas
+    (0 = everything on the primary) and records replication lag under a
+    low-rate insert stream on the primary.
+    """
+    filename = f"{framework}_{pool_mode}_{users}u_{replicas}r_{read_replicas}rr"
+    prefix = os.path.join(REPLICA_RESULTS_DIR, filename)
+
+    if os.path.exists(f"{prefix}_stats.csv"):
+        print(f"Skipping {filename}: Results already exist.")
+        return
+
+    print(
+        f"--- Running Replica Scenario: {framework} | {pool_mode} | "
+        f"{read_replicas} Read Replicas | {users} Users ---"
+    )
 
+    stop_event = threads = None
 
-def generate_summary():
+    try:
+        start_read_replicas(read_replicas, pool_mode)
+        start_scaled_app(
+            framework,
+            pool_mode,
+            replicas,
+            app_environment={"USE_READ_REPLICAS": "1" if read_replicas else "0"},
+        )
+
+        containers = {
+            "db": ["postgres"],
+            "replica": service_containers("postgres-replica"),
+            "pooler": (
+                ["pgbouncer"] + service_containers("pgbouncer-replica")
+                if pool_mode == "pooled"
+                else []
+            ),
+            "app": service_containers(f"{framework}-replica"),
+        }
+        stop_event, threads, resource_results, sample_results = start_monitor(
+            [c for names in containers.values() for c in names],
+            samplers={
+                "replay_lag_ms": sample_replay_lag_ms,
+                "replay_lag_bytes": sample_replay_lag_bytes,
+            },
+        )
+
+        start_write_load(parse_duration(RUN_TIME) + 30)
+        run_locust(f"http://localhost:{LOADBALANCER_PORT}", users, prefix)
+        stop_write_load()
+
+        stop_monitor(stop_event, threads)
+
+        with open(f"{prefix}_resources.json", "w") as f:
+            json.dump(resource_results, f)
+
+        save_scenario(
+            prefix,
+            {
+                "Framework": framework,
+                "Pool Mode": pool_mode,
+                "Read Replicas": read_replicas,
+                "Replicas": replicas,
+                "Users": users,
+            },
+            containers,
+            {
+                "Avg Replay Lag (ms)": round(sample_results["replay_lag_ms"]["avg"], 1),
+                "Peak Replay Lag (ms)": round(
+                    sample_results["replay_lag_ms"]["max"], 1
+                ),
+                "Peak Replay Lag (bytes)": sample_results["replay_lag_bytes"]["max"],
+            },
+        )
+
+    except Exception as e:
+        print(f"FAILED Scenario {filename}: {e}")
+        if stop_event:
+            stop_monitor(stop_event, threads)
+    finally:
+        stop_write_load()
+        stop_scaled_app(framework)
+
+
+def run_storm_scenario(framework, pool_mode, storm, users=STORM_USERS):
+    """
+    Hits cold app/pgbouncer pools with every user at once (cold-spawn), or
+    restarts the app under full load (restart), and measures how long it
+    takes to serve again, the errors on the way and Postgres backend forks.
+    """
+    filename = f"{framework}_{pool_mode}_{users}u_{storm}"
+    prefix = os.path.join(STORM_RESULTS_DIR, filename)
+
+    if os.path.exists(f"{prefix}_stats.csv"):
+        print(f"Skipping {filename}: Results already exist.")
+        return
+
+    print(
+        f"--- Running Storm Scenario: {framework} | {pool_mode} | {storm} | "
+        f"{users} Users ---"
+    )
+
+    service_name = f"{framework}-app"
+    port = APP_PORTS[framework]
+    stop_event = threads = restart_timer = None
+
+    try:
+        # Fresh app and bouncer: no connections left from earlier scenarios.
+        # No DB traffic happens while waiting, so every pool is still cold
+        containers = start_single_app(framework, pool_mode)
+        stop_event, threads, resource_results, sample_results = start_monitor(
+            [c for names in containers.values() for c in names],
+            samplers={
+                "pg_sessions": sample_pg_sessions,
+                "pg_connections": sample_pg_connections,
+            },
+        )
+
+        event = {}
+        if storm == "restart":
+
+            def restart_app():
+                event["time"] = time.time()
+                run_command(f"docker restart {service_name}")
+
+            restart_timer = threading.Timer(STORM_RESTART_AT, restart_app)
+            restart_timer.start()
+
+        timeline_file = f"{prefix}_timeline.json"
+        run_locust(
+            f"http://localhost:{port}",
+            users,
+            prefix,
+            spawn_rate=users,
+            run_time=STORM_RUN_TIME,
+            env={
+                "LOCUST_TIMELINE": timeline_file,
+                "LOCUST_REQUEST_TIMEOUT": str(STORM_REQUEST_TIMEOUT),
+            },
+        )
+
+        if restart_timer:
+            restart_timer.join()
+        stop_monitor(stop_event, threads)
+
+        with open(f"{prefix}_resources.json", "w") as f:
+            json.dump(resource_results, f)
+
+        metrics = analyze_timeline(timeline_file, event.get("time"))
+        forked, peak_fork_rate = fork_rate(sample_results["pg_sessions"]["series"])
+        metrics.update(
+            {
+                "Backends Forked": forked,
+                "Peak Backend Forks/s": round(peak_fork_rate, 1),
+                "Peak DB Connections": sample_results["pg_connections"]["max"],
+            }
+        )
+        try:
+            app_metrics = scrape_phase_metrics(port)
+            metrics["App Errors"] = app_metrics["App Errors"]
+            metrics["query_wait_timeout Errors"] = app_metrics[
+                "query_wait_timeout Errors"
+            ]
+        except Exception as e:
+            print(f"Metrics Warning: {e}")
+
+        save_scenario(
+            prefix,
+            {
+                "Framework": framework,
+                "Pool Mode": pool_mode,
+                "Storm": storm,
+                "Users": users,
+            },
+            containers,
+            metrics,
+        )
+
+    except Exception as e:
+        print(f"FAILED Scenario {filename}: {e}")
+        if restart_timer:
+            restart_timer.cancel()
+        if stop_event:
+            stop_monitor(stop_event, threads)
+    finally:
+        remove_override()
+
+
+def pgbouncer_admin(command, check=True):
+    """Runs a command (RELOAD, PAUSE, RESUME...) on PgBouncer's admin console."""
+    cmd = (
+        "docker exec -e PGPASSWORD=password postgres "
+        f"psql -h pgbouncer -p 6432 -U postgres -d pgbouncer -c '{command}'"
+    )
+    if check:
+        run_command(cmd)
+    else:
+        subprocess.run(cmd, shell=True, check=False, stderr=subprocess.DEVNULL)
+
+
+def inject_fault(fault, service_name, pool_mode):
+    """Injects `fault` and returns once the faulted component is back."""
+    if fault == "pgbouncer-restart":
+        run_command("docker restart pgbouncer")
+    elif fault == "pgbouncer-kill":
+        # SIGKILL: clients see connections reset instead of a clean shutdown
+        run_command("docker kill pgbouncer")
+        time.sleep(CHAOS_OUTAGE)
+        run_command("docker start pgbouncer")
+    elif fault == "pgbouncer-reload":
+        pgbouncer_admin("RELOAD")
+    elif fault == "pgbouncer-pause":
+        # PAUSE waits for running queries, then holds new ones until RESUME
+        pgbouncer_admin("PAUSE")
+        time.sleep(CHAOS_OUTAGE)
+        pgbouncer_admin("RESUME")
+    elif fault == "postgres-restart":
+        run_command("docker restart postgres")
+    elif fault == "packet-drop":
+        target = "pgbouncer" if pool_mode == "pooled" else "postgres"
+        apply_netem(service_name, target, loss=100)
+        time.sleep(CHAOS_OUTAGE)
+        clear_netem(service_name)
+    else:
+        raise ValueError(f"Unknown fault: {fault}")
+
+
+def restore_after_fault(service_name):
+    """Best-effort undo of any fault left half-applied by a failed scenario."""
+    subprocess.run("docker start postgres pgbouncer", shell=True, check=False)
+    pgbouncer_admin("RESUME", check=False)
+    clear_netem(service_name)
+
+
+def fault_impact(path, start, end):
+    """
+    Error burst and latency impact of a fault from a Locust timeline:
+    failures from `start` until RECOVERY_WINDOW seconds after `end`, and the
+    worst per-second P99 in that window against the pre-fault median P99.
+    """
+    with open(path, "r") as f:
+        buckets = json.load(f)["buckets"]
+
+    before = [b["p99"] for b in buckets if b["time"] < int(start) and b["p99"]]
+    during = [
+        b for b in buckets if int(start) <= b["time"] <= int(end) + RECOVERY_WINDOW
+    ]
+    baseline = statistics.median(before) if before else None
+    peak = max((b["p99"] for b in during if b["p99"]), default=None)
+    return {
+        "Fault Duration (s)": round(end - start, 1),
+        "Error Burst": sum(b["fail"] for b in during),
+        "Pre-Fault P99 (ms)": baseline,
+        "Peak P99 After Fault (ms)": peak,
+        "P99 Impact (x)": (
+            round(peak / baseline, 2) if baseline and peak is not None else None
+        ),
+    }
+
+
+def run_chaos_scenario(framework, pool_mode, fault, resilience, users=CHAOS_USERS):
+    """
+    Injects `fault` CHAOS_AT seconds into a steady run and measures the
+    error burst, time to recovery and latency impact, with the apps' pool
+    pre-ping/retry settings off or on (`resilience`).
+    """
+    filename = f"{framework}_{pool_mode}_{users}u_{fault}_resilience-{resilience}"
+    prefix = os.path.join(CHAOS_RESULTS_DIR, filename)
+
+    if os.path.exists(f"{prefix}_stats.csv"):
+        print(f"Skipping {filename}: Results already exist.")
+        return
+
+    print(
+        f"--- Running Chaos Scenario: {framework} | {pool_mode} | {fault} | "
+        f"resilience {resilience} | {users} Users ---"
+    )
+
+    service_name = f"{framework}-app"
+    port = APP_PORTS[framework]
+    stop_event = threads = fault_timer = None
+
+    try:
+        # Fresh bouncer: no killed/paused state left from the previous fault
+        containers = start_single_app(
+            framework, pool_mode, environment=CHAOS_RESILIENCE[resilience]
+        )
+        stop_event, threads, resource_results, _ = start_monitor(
+            [c for names in containers.values() for c in names]
+        )
+
+        event = {}
+
+        def fault_step():
+            event["start"] = time.time()
+            try:
+                inject_fault(fault, service_name, pool_mode)
+            finally:
+                event["end"] = time.time()
+
+        fault_timer = threading.Timer(CHAOS_AT, fault_step)
+        fault_timer.start()
+
+        timeline_file = f"{prefix}_timeline.json"
+        run_locust(
+            f"http://localhost:{port}",
+            users,
+            prefix,
+            run_time=CHAOS_RUN_TIME,
+            env={
+                "LOCUST_TIMELINE": timeline_file,
+                "LOCUST_REQUEST_TIMEOUT": str(CHAOS_REQUEST_TIMEOUT),
+            },
+        )
+
+        fault_timer.join()
+        stop_monitor(stop_event, threads)
+
+        with open(f"{prefix}_resources.json", "w") as f:
+            json.dump(resource_results, f)
+
+        metrics = analyze_timeline(timeline_file, event["start"])
+        metrics.update(fault_impact(timeline_file, event["start"], event["end"]))
+        try:
+            metrics["App Errors"] = scrape_phase_metrics(port)["App Errors"]
+        except Exception as e:
+            print(f"Metrics Warning: {e}")
+
+        save_scenario(
+            prefix,
+            {
+                "Framework": framework,
+                "Pool Mode": pool_mode,
+                "Fault": fault,
+                "Resilience": resilience,
+                "Users": users,
+            },
+            containers,
+            metrics,
+        )
+
+    except Exception as e:
+        print(f"FAILED Scenario {filename}: {e}")
+        if fault_timer:
+            fault_timer.cancel()
+        if stop_event:
+            stop_monitor(stop_event, threads)
+    finally:
+        restore_after_fault(service_name)
+        remove_override()
+
+
+def container_network(container):
+    """Name of the (compose-prefixed) network a container is attached to."""
+    cmd = [
+        "docker",
+        "inspect",
+        "-f",
+        "{{range $name, $_ := .NetworkSettings.Networks}}{{$name}} {{end}}",
+        container,
+    ]
+    return subprocess.check_output(cmd).decode().split()[0]
+
+
+def measure_connect_ms(host, port, sslmode):
+    """
+    Average connection setup time (ms) to `host` with pgbench -C, which opens
+    a new connection for every `SELECT 1`. Runs in a throwaway client
+    container on the benchmark network, outside every tier's CPU limit.
+    """
+    pgbench = (
+        f"pgbench -n -C -f /tmp/connect.sql -c {TLS_PGBENCH_CLIENTS} "
+        f"-T {TLS_PGBENCH_TIME} -h {host} -p {port} -U postgres benchmark_db"
+    )
+    cmd = (
+        f"docker run --rm --network {container_network('postgres')} "
+        f"-e PGPASSWORD=password -e PGSSLMODE={sslmode} {PGBENCH_IMAGE} "
+        f"sh -c \"echo 'SELECT 1;' > /tmp/connect.sql && {pgbench}\""
+    )
+    print(f"Executing: {cmd}")
+    output = subprocess.check_output(cmd, shell=True).decode()
+    match = re.search(r"average connection time = ([\d.]+) ms", output)
+    return float(match.group(1)) if match else None
+
+
+def handshake_metrics(label, host, port, sslmode):
+    """Connection time over one hop and its TLS share vs a plaintext connect."""
+    connect = measure_connect_ms(host, port, sslmode)
+    metrics = {f"{label} Connect (ms)": connect}
+    if sslmode != "disable":
+        plain = measure_connect_ms(host, port, "disable")
+        if connect is not None and plain is not None:
+            metrics[f"{label} Handshake Cost (ms)"] = round(connect - plain, 2)
+    else:
+        metrics[f"{label} Handshake Cost (ms)"] = 0
+    return metrics
+
+
+def run_tls_scenario(framework, pool_mode, tls, users=TLS_USERS):
+    """
+    Runs a scenario with TLS on none / the app -> pgbouncer hop only /
+    every hop (`tls`), measuring per-hop handshake cost with pgbench and
+    CPU on each tier under Locust load.
+    """
+    filename = f"{framework}_{pool_mode}_{users}u_tls-{tls}"
+    prefix = os.path.join(TLS_RESULTS_DIR, filename)
+
+    if os.path.exists(f"{prefix}_stats.csv"):
+        print(f"Skipping {filename}: Results already exist.")
+        return
+
+    print(
+        f"--- Running TLS Scenario: {framework} | {pool_mode} | TLS: {tls} | "
+        f"{users} Users ---"
+    )
+
+    port = APP_PORTS[framework]
+    sslmodes = TLS_MODES[tls]
+    stop_event = threads = None
+
+    try:
+        pgbouncer_override = None
+        if sslmodes["server"] != "disable":
+            pgbouncer_override = {
+                "command": ["pgbouncer", "/etc/pgbouncer/pgbouncer-server-tls.ini"]
+            }
+        # pgbouncer is recreated, so server connections match this TLS mode
+        containers = start_single_app(
+            framework,
+            pool_mode,
+            environment={"DB_SSLMODE": sslmodes["app"]},
+            pgbouncer_override=pgbouncer_override,
+        )
+
+        # Handshake cost per hop, before the load so pgbench runs uncontended.
+        # Each hop is measured with the sslmode of the client that uses it:
+        # the app for its first hop, pgbouncer's server_tls_sslmode for postgres.
+        if pool_mode == "pooled":
+            metrics = handshake_metrics("Pooler", "pgbouncer", 6432, sslmodes["app"])
+            metrics.update(
+                handshake_metrics("DB", "postgres", 5432, sslmodes["server"])
+            )
+        else:
+            metrics = handshake_metrics("DB", "postgres", 5432, sslmodes["app"])
+
+        stop_event, threads, resource_results, _ = start_monitor(
+            [c for names in containers.values() for c in names]
+        )
+
+        run_locust(f"http://localhost:{port}", users, prefix)
+
+        stop_monitor(stop_event, threads)
+
+        with open(f"{prefix}_resources.json", "w") as f:
+            json.dump(resource_results, f)
+
+        try:
+            metrics.update(scrape_phase_metrics(port))
+        except Exception as e:
+            print(f"Metrics Warning: {e}")
+
+        save_scenario(
+            prefix,
+            {
+                "Framework": framework,
+                "Pool Mode": pool_mode,
+                "TLS": tls,
+                "Users": users,
+            },
+            containers,
+            metrics,
+        )
+
+    except Exception as e:
+        print(f"FAILED Scenario {filename}: {e}")
+        if stop_event:
+            stop_monitor(stop_event, threads)
+    finally:
+        remove_override()
+
+
+def run_batch_scenario(framework, pool_mode, strategy, batch_size, users=BATCH_USERS):
+    """
+    Loads `batch_size` posts per request from /benchmark/posts with one of the
+    app's batching strategies and reports per-item latency and DB connections.
+    """
+    filename = f"{framework}_{pool_mode}_{users}u_{strategy}_batch{batch_size}"
+    prefix = os.path.join(BATCH_RESULTS_DIR, filename)
+
+    if os.path.exists(f"{prefix}_stats.csv"):
+        print(f"Skipping {filename}: Results already exist.")
+        return
+
+    print(
+        f"--- Running Batch Scenario: {framework} | {pool_mode} | {strategy} | "
+        f"Batch {batch_size} | {users} Users ---"
+    )
+
+    port = APP_PORTS[framework]
+    stop_event = threads = None
+
+    try:
+        containers = start_single_app(framework, pool_mode)
+        stop_event, threads, resource_results, sample_results = start_monitor(
+            [c for names in containers.values() for c in names],
+            samplers={"pg_connections": sample_pg_connections},
+        )
+
+        run_locust(
+            f"http://localhost:{port}",
+            users,
+            prefix,
+            env={
+                "LOCUST_BATCH_SIZE": str(batch_size),
+                "LOCUST_BATCH_STRATEGY": strategy,
+            },
+        )
+
+        stop_monitor(stop_event, threads)
+
+        with open(f"{prefix}_resources.json", "w") as f:
+            json.dump(resource_results, f)
+
+        stats = pd.read_csv(f"{prefix}_stats.csv")
+        agg = stats[stats["Name"] == "Aggregated"].iloc[0]
+        metrics = {
+            "Posts/s": round(agg["Requests/s"] * batch_size, 1),
+            "Per-Item Avg (ms)": round(agg["Average Response Time"] / batch_size, 2),
+            "Per-Item P99 (ms)": round(agg["99%"] / batch_size, 2),
+            "Peak DB Connections": sample_results["pg_connections"]["max"],
+        }
+        try:
+            metrics.update(scrape_phase_metrics(port))
+        except Exception as e:
+            print(f"Metrics Warning: {e}")
+
+        save_scenario(
+            prefix,
+            {
+                "Framework": framework,
+                "Pool Mode": pool_mode,
+                "Strategy": strategy,
+                "Batch Size": batch_size,
+                "Users": users,
+            },
+            containers,
+            metrics,
+        )
+
+    except Exception as e:
+        print(f"FAILED Scenario {filename}: {e}")
+        if stop_event:
+            stop_monitor(stop_event, threads)
+    finally:
+        remove_override()
+
+
+def run_stream_scenario(framework, pool_mode, rows, users=STREAM_USERS):
+    """
+    Streams `rows` comments per request as NDJSON and reports time to first
+    byte, throughput and the workers' peak RSS (VmHWM).
+    """
+    filename = f"{framework}_{pool_mode}_{users}u_stream{rows}"
+    prefix = os.path.join(STREAM_RESULTS_DIR, filename)
+
+    if os.path.exists(f"{prefix}_stats.csv"):
+        print(f"Skipping {filename}: Results already exist.")
+        return
+
+    print(
+        f"--- Running Stream Scenario: {framework} | {pool_mode} | {rows} Rows | "
+        f"{users} Users ---"
+    )
+
+    service_name = f"{framework}-app"
+    port = APP_PORTS[framework]
+    stop_event = threads = None
+
+    try:
+        # The app is recreated, so VmHWM only covers this scenario
+        containers = start_single_app(framework, pool_mode)
+        stop_event, threads, resource_results, sample_results = start_monitor(
+            [c for names in containers.values() for c in names],
+            samplers={"pg_connections": sample_pg_connections},
+        )
+
+        stream_stats_file = f"{prefix}_stream.json"
+        run_locust(
+            f"http://localhost:{port}",
+            users,
+            prefix,
+            env={
+                "LOCUST_STREAM_ROWS": str(rows),
+                "LOCUST_STREAM_CHUNK_SIZE": str(STREAM_CHUNK_SIZE),
+                "LOCUST_STREAM_STATS": stream_stats_file,
+                "LOCUST_REQUEST_TIMEOUT": str(STREAM_REQUEST_TIMEOUT),
+            },
+        )
+
+        stop_monitor(stop_event, threads)
+
+        with open(f"{prefix}_resources.json", "w") as f:
+            json.dump(resource_results, f)
+
+        stats = pd.read_csv(f"{prefix}_stats.csv")
+        agg = stats[stats["Name"] == "Aggregated"].iloc[0]
+        metrics = {
+            "Rows/s": round(agg["Requests/s"] * rows, 1),
+            "MB/s": round(agg["Requests/s"] * agg["Average Content Size"] / 1e6, 2),
+            "Peak DB Connections": sample_results["pg_connections"]["max"],
+        }
+        if os.path.exists(stream_stats_file):
+            with open(stream_stats_file, "r") as f:
+                metrics.update(json.load(f))
+        try:
+            metrics["Peak Worker RSS (MB)"] = worker_peak_rss_mb(service_name)
+        except Exception as e:
+            print(f"RSS Warning: {e}")
+
+        save_scenario(
+            prefix,
+            {
+                "Framework": framework,
+                "Pool Mode": pool_mode,
+                "Rows": rows,
+                "Users": users,
+            },
+            containers,
+            metrics,
+        )
+
+    except Exception as e:
+        print(f"FAILED Scenario {filename}: {e}")
+        if stop_event:
+            stop_monitor(stop_event, threads)
+    finally:
+        remove_override()
+
+
+def load_scenario(results_dir, base_name):
+    """
+    Loads a scenario's parameters, falling back to the
+    `{framework}_{pool_mode}_{users}u` filename for older results.
+    """
+    path = os.path.join(results_dir, f"{base_name}_scenario.json")
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+
+    parts = base_name.split("_")
+    if len(parts) != 3:
+        return None
+
+    # Unshaped standard runs, so they still match new runs as a baseline
+    framework, pool_mode, users = parts
+    return {
+        "dims": standard_dims(framework, pool_mode, int(users.replace("u", ""))),
+        "containers": {"db": ["postgres"], "app": [f"{framework}-app"]},
+        "metrics": {},
+    }
+
+
+def summarize_resources(res, containers):
+    """
+    Aggregates container stats per role.
+    CPU is summed across a role's containers (replicas), memory is averaged.
+    """
+    labels = {"db": "DB", "replica": "Replica", "pooler": "Pooler", "app": "App"}
+    row = {}
+    for role, label in labels.items():
+        if role not in containers:
+            continue
+        names = [c for c in containers.get(role, []) if c in res]
+        cpu = sum(res[c]["avg_cpu"] for c in names)
+        mem = statistics.mean(res[c]["avg_mem"] for c in names) if names else 0
+        row[f"{label} CPU (%)"] = round(cpu, 1)
+        row[f"{label} Mem (%)"] = round(mem, 1)
+    return row
+
+
+def summarize_scenario(results_dir, base_name, scenario):
+    """
+    One summary row: the scenario's dims, Locust aggregate stats, per-role
+    resource usage and its extra metrics.
+    """
+    df = pd.read_csv(os.path.join(results_dir, f"{base_name}_stats.csv"))
+    agg = df[df["Name"] == "Aggregated"].iloc[0]
+
+    # Read Resources
+    res_path = os.path.join(results_dir, f"{base_name}_resources.json")
+    res = {}
+    if os.path.exists(res_path):
+        with open(res_path, "r") as f:
+            res = json.load(f)
+
+    row = dict(scenario["dims"])
+    row.update(
+        {
+            "RPS": agg["Requests/s"],
+            "P95 Latency (ms)": agg["95%"],
+            "P99 Latency (ms)": agg["99%"],
+            "Failures/s": agg["Failures/s"],
+        }
+    )
+    row.update(summarize_resources(res, scenario["containers"]))
+    row.update(scenario["metrics"])
+    return row
+
+
+def generate_summary(results_dir=RESULTS_DIR, output="summary_report.csv"):
     """Reads all CSV results and creates a summary report."""
     print("Generating Summary Report...")
     summary_data = []
+    sort_keys = []
 
-    for filename in os.listdir(RESULTS_DIR):
+    for filename in os.listdir(results_dir):
         if filename.endswith("_stats.csv"):
             base_name = filename.replace("_stats.csv", "")
-            parts = base_name.split("_")
-            if len(parts) != 3:
+            scenario = load_scenario(results_dir, base_name)
+            if scenario is None:
                 continue
 
-            framework = parts[0]
-            pool_mode = parts[1]
-            users = parts[2].replace("u", "")
-
-            # Read Stats
             try:
-                df = pd.read_csv(os.path.join(RESULTS_DIR, filename))
-                agg = df[df["Name"] == "Aggregated"].iloc[0]
-
-                # Read Resources
-                res_path = os.path.join(RESULTS_DIR, f"{base_name}_resources.json")
-                db_cpu = db_mem = app_cpu = app_mem = 0
-                if os.path.exists(res_path):
-                    with open(res_path, "r") as f:
-                        res = json.load(f)
-                        if "postgres" in res:
-                            db_cpu = round(res["postgres"]["avg_cpu"], 1)
-                            db_mem = round(res["postgres"]["avg_mem"], 1)
-
-                        app_container = f"{framework}-app"
-                        if app_container in res:
-                            app_cpu = round(res[app_container]["avg_cpu"], 1)
-                            app_mem = round(res[app_container]["avg_mem"], 1)
-
                 summary_data.append(
-                    {
-                        "Framework": framework,
-                        "Pool Mode": pool_mode,
-                        "Users": int(users),
-                        "RPS": agg["Requests/s"],
-                        "P95 Latency (ms)": agg["95%"],
-                        "P99 Latency (ms)": agg["99%"],
-                        "Failures/s": agg["Failures/s"],
-                        "DB CPU (%)": db_cpu,
-                        "DB Mem (%)": db_mem,
-                        "App CPU (%)": app_cpu,
-                        "App Mem (%)": app_mem,
-                    }
+                    summarize_scenario(results_dir, base_name, scenario)
                 )
+                sort_keys = list(scenario["dims"])
             except Exception as e:
                 print(f"Failed to process {filename}: {e}")
 
     if summary_data:
         summary_df = pd.DataFrame(summary_data)
-        summary_df = summary_df.sort_values(by=["Framework", "Pool Mode", "Users"])
+        summary_df = summary_df.sort_values(by=sort_keys)
 
         # Save to CSV
-        summary_df.to_csv("summary_report.csv", index=False)
+        summary_df.to_csv(output, index=False)
+
+        print(f"Summary Report Saved to {output}")
+
+
+def run_standard_benchmark(args):
+    if args.profile:
+        os.makedirs(PROFILES_DIR, exist_ok=True)
+
+    for framework in FRAMEWORKS:
+        for pool_mode in POOL_MODES:
+            for network in args.network:
+                for users in USER_COUNTS:
+                    run_scenario(
+                        framework,
+                        pool_mode,
+                        users,
+                        profile=args.profile,
+                        network=network,
+                    )
+                    time.sleep(5)
+
+    generate_summary()
+    if args.profile:
+        generate_profile_diffs(args.network)
+
+
+def run_scaling_benchmark(args):
+    os.makedirs(SCALING_RESULTS_DIR, exist_ok=True)
+
+    for framework in FRAMEWORKS:
+        for pool_mode in POOL_MODES:
+            for replicas in SCALING_REPLICA_COUNTS:
+                run_scaling_scenario(framework, pool_mode, replicas)
+                time.sleep(5)
+
+    generate_summary(
+        SCALING_RESULTS_DIR, os.path.join(SCALING_RESULTS_DIR, "summary_report.csv")
+    )
+
+
+def run_pooler_benchmark(args):
+    os.makedirs(POOLER_RESULTS_DIR, exist_ok=True)
+
+    for framework in FRAMEWORKS:
+        for processes in POOLER_PROCESS_COUNTS:
+            for cpus in POOLER_CPU_LIMITS:
+                run_pooler_scenario(framework, processes, cpus)
+                time.sleep(5)
+
+    generate_summary(
+        POOLER_RESULTS_DIR, os.path.join(POOLER_RESULTS_DIR, "summary_report.csv")
+    )
+
+
+def run_replica_benchmark(args):
+    os.makedirs(REPLICA_RESULTS_DIR, exist_ok=True)
+
+    # Replica count is the outer loop so replicas are only ever scaled up
+    for read_replicas in READ_REPLICA_COUNTS:
+        for framework in FRAMEWORKS:
+            for pool_mode in POOL_MODES:
+                run_replica_scenario(framework, pool_mode, read_replicas)
+                time.sleep(5)
 
-        print("Summary Report Saved to summary_report.csv")
+    generate_summary(
+        REPLICA_RESULTS_DIR, os.path.join(REPLICA_RESULTS_DIR, "summary_report.csv")
+    )
+
+
+def run_storm_benchmark(args):
+    os.makedirs(STORM_RESULTS_DIR, exist_ok=True)
+
+    for framework in FRAMEWORKS:
+        for pool_mode in POOL_MODES:
+            for storm in STORM_TYPES:
+                run_storm_scenario(framework, pool_mode, storm)
+                time.sleep(5)
+
+    generate_summary(
+        STORM_RESULTS_DIR, os.path.join(STORM_RESULTS_DIR, "summary_report.csv")
+    )
+
+
+def run_chaos_benchmark(args):
+    os.makedirs(CHAOS_RESULTS_DIR, exist_ok=True)
+
+    for framework in FRAMEWORKS:
+        for pool_mode in POOL_MODES:
+            for fault in CHAOS_FAULTS:
+                if fault.startswith("pgbouncer-") and pool_mode != "pooled":
+                    continue
+                for resilience in CHAOS_RESILIENCE:
+                    run_chaos_scenario(framework, pool_mode, fault, resilience)
+                    time.sleep(5)
+
+    generate_summary(
+        CHAOS_RESULTS_DIR, os.path.join(CHAOS_RESULTS_DIR, "summary_report.csv")
+    )
+
+
+def run_tls_benchmark(args):
+    os.makedirs(TLS_RESULTS_DIR, exist_ok=True)
+
+    for framework in FRAMEWORKS:
+        for pool_mode in POOL_MODES:
+            for tls in TLS_MODES:
+                # Without a bouncer there is only one hop
+                if tls == "app-bouncer" and pool_mode != "pooled":
+                    continue
+                run_tls_scenario(framework, pool_mode, tls)
+                time.sleep(5)
+
+    generate_summary(
+        TLS_RESULTS_DIR, os.path.join(TLS_RESULTS_DIR, "summary_report.csv")
+    )
+
+
+def run_batch_benchmark(args):
+    os.makedirs(BATCH_RESULTS_DIR, exist_ok=True)
+
+    for framework in FRAMEWORKS:
+        for pool_mode in POOL_MODES:
+            for strategy in BATCH_STRATEGIES[framework]:
+                for batch_size in BATCH_SIZES:
+                    run_batch_scenario(framework, pool_mode, strategy, batch_size)
+                    time.sleep(5)
+
+    generate_summary(
+        BATCH_RESULTS_DIR, os.path.join(BATCH_RESULTS_DIR, "summary_report.csv")
+    )
+
+
+def run_stream_benchmark(args):
+    os.makedirs(STREAM_RESULTS_DIR, exist_ok=True)
+
+    for framework in FRAMEWORKS:
+        for pool_mode in POOL_MODES:
+            for rows in STREAM_ROW_COUNTS:
+                run_stream_scenario(framework, pool_mode, rows)
+                time.sleep(5)
+
+    generate_summary(
+        STREAM_RESULTS_DIR, os.path.join(STREAM_RESULTS_DIR, "summary_report.csv")
+    )
+
+
+MODES = {
+    "standard": run_standard_benchmark,
+    "scaling": run_scaling_benchmark,
+    "pooler": run_pooler_benchmark,
+    "replicas": run_replica_benchmark,
+    "storm": run_storm_benchmark,
+    "chaos": run_chaos_benchmark,
+    "tls": run_tls_benchmark,
+    "batch": run_batch_benchmark,
+    "stream": run_stream_benchmark,
+}
 
 
 def main():
+    parser = argparse.ArgumentParser(description="PgBouncer benchmark runner")
+    parser.add_argument(
+        "mode",
+        nargs="?",
+        default="standard",
+        choices=list(MODES),
+        help="standard: single container per framework, "
+        "scaling: sweep app replicas behind the load balancer, "
+        "pooler: sweep pgbouncer processes (so_reuseport) and CPU limits, "
+        "replicas: route reads to N streaming replicas, "
+        "storm: connection storms against cold pools, "
+        "chaos: pgbouncer/postgres faults and packet drops under load, "
+        "tls: TLS off / app->pgbouncer only / end-to-end, "
+        "batch: multi-post endpoint by batching strategy and batch size, "
+        "stream: NDJSON comment streaming (TTFB, throughput, worker RSS)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="standard mode: sample app workers with py-spy and save flame graphs",
+    )
+    parser.add_argument(
+        "--network",
+        nargs="+",
+        default=["none"],
+        choices=list(NETWORK_PROFILES),
+        help="standard mode: network profiles (tc netem) to sweep",
+    )
+    args = parser.parse_args()
+
     if not os.path.exists(RESULTS_DIR):
         os.makedirs(RESULTS_DIR)
 
     cleanup()
 
     try:
+        ensure_certs()
         ensure_db_ready()
-
-        for framework in FRAMEWORKS:
-            for pool_mode in POOL_MODES:
-                for users in USER_COUNTS:
-                    run_scenario(framework, pool_mode, users)
-                    time.sleep(5)
-
-        generate_summary()
+        MODES[args.mode](args)
 
     except KeyboardInterrupt:
         print("Interrupted by user.")
@@ -0,0 +1,112 @@
+import pytest
+
+from compare import NOISE_Z, check, load_results, noise_percent
+from run_benchmark import save_scenario, standard_dims
+
+STATS_CSV = "Name,Requests/s,95%,99%,Failures/s\nAggregated,100.0,50,80,0.0\n"
+
+
+def write_stats(results_dir, base_name):
+    (results_dir / f"{base_name}_stats.csv").write_text(STATS_CSV)
+
+
+def test_check_within_threshold_is_ok():
+    result = check("RPS", 100.0, 95.0, 10.0, higher_is_better=True)
+    assert result["Delta"] == -5.0
+    assert result["Unit"] == "%"
+    assert result["Status"] == "ok"
+
+
+def test_check_regression_fails():
+    assert check("RPS", 100.0, 80.0, 10.0, higher_is_better=True)["Status"] == "FAIL"
+    assert check("P99 Latency (ms)", 100.0, 130.0, 15.0)["Status"] == "FAIL"
+
+
+def test_check_improvement_is_better():
+    assert check("RPS", 100.0, 130.0, 10.0, higher_is_better=True)["Status"] == "better"
+    assert check("P99 Latency (ms)", 100.0, 50.0, 15.0)["Status"] == "better"
+
+
+def test_check_noise_widens_allowed_change():
+    result = check("RPS", 100.0, 80.0, 10.0, noise=25.0, higher_is_better=True)
+    assert result["Allowed"] == 25.0
+    assert result["Status"] == "ok"
+
+
+def test_check_floor_ignores_small_absolute_changes():
+    # +100% relative, but only 2 points of CPU
+    assert check("App CPU (%)", 2.0, 4.0, 15.0, floor=5.0)["Status"] == "ok"
+    assert check("App CPU (%)", 20.0, 40.0, 15.0, floor=5.0)["Status"] == "FAIL"
+
+
+def test_check_absolute_uses_points():
+    result = check("Failure Rate (%)", 0.0, 2.5, 1.0, absolute=True)
+    assert result["Delta"] == 2.5
+    assert result["Allowed"] == 1.0
+    assert result["Unit"] == "pts"
+    assert result["Status"] == "FAIL"
+    assert check("Failure Rate (%)", 0.0, 0.5, 1.0, absolute=True)["Status"] == "ok"
+
+
+def test_check_zero_baseline_relative():
+    result = check("P99 Latency (ms)", 0.0, 50.0, 15.0)
+    assert result["Delta"] == 0.0
+    assert result["Status"] == "ok"
+
+
+@pytest.mark.parametrize(
+    "baseline, candidate",
+    [(None, [1, 2, 3]), ([], [1, 2, 3]), ([1, 2], [1, 2, 3]), ([1, 2, 3], [1, 2])],
+)
+def test_noise_percent_needs_three_samples(baseline, candidate):
+    assert noise_percent(baseline, candidate, 100.0) == 0.0
+
+
+def test_noise_percent_zero_reference():
+    assert noise_percent([1, 2, 3], [4, 5, 6], 0) == 0.0
+
+
+def test_noise_percent_standard_error():
+    # Sample variance 2/3 with 4 samples on each side
+    baseline = [99.0, 100.0, 101.0, 100.0]
+    candidate = [99.0, 100.0, 101.0, 100.0]
+    expected = NOISE_Z * (2 / 3 / 4 * 2) ** 0.5
+    assert noise_percent(baseline, candidate, 100.0) == pytest.approx(expected)
+
+
+def test_noisy_history_allows_larger_drop():
+    quiet = [100.0, 101.0, 99.0, 100.0, 100.0]
+    noisy = [60.0, 140.0, 70.0, 130.0, 100.0]
+    noise = noise_percent(noisy, noisy, 100.0)
+    assert noise > 20.0
+    assert (
+        check(
+            "RPS",
+            100.0,
+            80.0,
+            10.0,
+            noise_percent(quiet, quiet, 100.0),
+            higher_is_better=True,
+        )["Status"]
+        == "FAIL"
+    )
+    assert (
+        check("RPS", 100.0, 80.0, 10.0, noise, higher_is_better=True)["Status"] == "ok"
+    )
+
+
+def test_legacy_results_match_new_standard_runs(tmp_path):
+    legacy = tmp_path / "legacy"
+    current = tmp_path / "current"
+    legacy.mkdir()
+    current.mkdir()
+    # Before scenario.json, only the {framework}_{pool_mode}_{users}u name
+    write_stats(legacy, "fastapi_direct_500u")
+    write_stats(current, "fastapi_direct_500u")
+    save_scenario(
+        str(current / "fastapi_direct_500u"),
+        standard_dims("fastapi", "direct", 500),
+        {"db": ["postgres"], "app": ["fastapi-app"]},
+    )
+
+    assert load_results(legacy).keys() == load_results(current).keys()
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from run_benchmark import analyze_timeline, fault_impact, fork_rate
+
+START = 1000.2
+
+
+def bucket(time, ok=100, fail=0, p99=50.0):
+    return {"time": time, "ok": ok, "fail": fail, "timeout": 0, "p99": p99}
+
+
+def write_timeline(tmp_path, buckets, start=START):
+    path = tmp_path / "timeline.json"
+    path.write_text(json.dumps({"start": start, "buckets": buckets}))
+    return str(path)
+
+
+def outage(first, last, end=1060):
+    """Steady until `first`, only failures from `first` to `last`, steady after."""
+    return [
+        bucket(t, ok=0, fail=20, p99=None) if first <= t <= last else bucket(t)
+        for t in range(1000, end)
+    ]
+
+
+def test_cold_spawn_measures_from_run_start(tmp_path):
+    buckets = [bucket(t, ok=0, fail=50, p99=None) for t in range(1000, 1003)]
+    buckets += [bucket(t) for t in range(1003, 1030)]
+
+    metrics = analyze_timeline(write_timeline(tmp_path, buckets))
+
+    assert metrics["Steady RPS"] == 100
+    assert metrics["Time to First Success (s)"] == 2.8
+    assert metrics["Recovery Time (s)"] == 2.8
+    assert metrics["Error Rate (%)"] == pytest.approx(150 / 2850 * 100, abs=0.01)
+
+
+def test_mid_run_outage_ignores_successes_before_the_event(tmp_path):
+    # The event's own second still holds successes from before the outage,
+    # and the first second back is only partly healthy
+    buckets = outage(1031, 1037)
+    buckets[30] = bucket(1030, ok=40)
+    buckets[38] = bucket(1038, ok=50, fail=5)
+
+    metrics = analyze_timeline(write_timeline(tmp_path, buckets), 1030.4)
+
+    assert metrics["Time to First Success (s)"] == 7.6
+    assert metrics["Recovery Time (s)"] == 8.6
+
+
+def test_run_that_never_breaks_recovers_immediately(tmp_path):
+    buckets = [bucket(t) for t in range(1000, 1060)]
+
+    metrics = analyze_timeline(write_timeline(tmp_path, buckets), 1030.4)
+
+    assert metrics["Time to First Success (s)"] == 0
+    assert metrics["Recovery Time (s)"] == 0
+    assert metrics["Error Rate (%)"] == 0
+
+
+def test_run_that_never_recovers(tmp_path):
+    buckets = outage(1031, 1059)
+
+    metrics = analyze_timeline(write_timeline(tmp_path, buckets), 1030.4)
+
+    assert metrics["Time to First Success (s)"] is None
+    assert metrics["Recovery Time (s)"] is None
+
+
+def test_empty_timeline(tmp_path):
+    assert analyze_timeline(write_timeline(tmp_path, [])) == {}
+
+
+def test_fault_impact_counts_the_burst_and_p99(tmp_path):
+    buckets = outage(1031, 1037)
+    buckets[38] = bucket(1038, ok=80, fail=5, p99=400.0)
+
+    metrics = fault_impact(write_timeline(tmp_path, buckets), 1030.4, 1033.9)
+
+    assert metrics["Fault Duration (s)"] == 3.5
+    # 1030 .. 1033 + RECOVERY_WINDOW
+    assert metrics["Error Burst"] == 7 * 20 + 5
+    assert metrics["Pre-Fault P99 (ms)"] == 50.0
+    assert metrics["Peak P99 After Fault (ms)"] == 400.0
+    assert metrics["P99 Impact (x)"] == 8.0
+
+
+def test_fault_impact_without_pre_fault_samples(tmp_path):
+    buckets = outage(1000, 1005)
+
+    metrics = fault_impact(write_timeline(tmp_path, buckets), 1000.0, 1001.0)
+
+    assert metrics["Pre-Fault P99 (ms)"] is None
+    assert metrics["P99 Impact (x)"] is None
+
+
+def test_fork_rate():
+    assert fork_rate([]) == (0, 0)
+    assert fork_rate([(0.0, 10)]) == (0, 0)
+    assert fork_rate([(0.0, 10), (1.0, 15), (3.0, 35)]) == (25, 10)
@@ -0,0 +1,24 @@
+#!/bin/sh
+# Generates a local CA and one server certificate shared by postgres and
+# pgbouncer (SANs for both service names and localhost) into tls/certs/.
+# Benchmark use only; does nothing if the certificate already exists.
+set -e
+
+DIR="$(cd "$(dirname "$0")" && pwd)/certs"
+KEY_TYPE="${TLS_KEY_TYPE:-rsa:2048}"
+mkdir -p "$DIR"
+cd "$DIR"
+
+[ -f server.crt ] && exit 0
+
+openssl req -new -x509 -days 3650 -nodes -newkey "$KEY_TYPE" \
+    -subj "/CN=benchmark-ca" -keyout ca.key -out ca.crt
+openssl req -new -nodes -newkey "$KEY_TYPE" \
+    -subj "/CN=postgres" -keyout server.key -out server.csr
+printf "subjectAltName=DNS:postgres,DNS:pgbouncer,DNS:localhost\n" > san.ext
+openssl x509 -req -days 3650 -in server.csr -CA ca.crt -CAkey ca.key \
+    -CAcreateserial -extfile san.ext -out server.crt
+rm -f server.csr san.ext
+
+# pgbouncer reads the key as its own user; postgres installs a 0600 copy at startup
+chmod 644 server.key